@@ -11,8 +11,9 @@ from website.views import (
     AdminWebsiteRequestUpdateView
 )
 from template.views import TemplateListView
-from chat.views import MessageHistoryView, UnreadCountView
+from chat.views import ConversationListView, MarkReadView, MessageHistoryView, UnreadCountView, WebSocketTicketView
 from message.views import ContactMessageCreateView
+from mailer.views import BrevoWebhookView
 urlpatterns = [
     path('signup/', RegisterView.as_view(), name='signup'),
     path('login/', LoginView.as_view(), name='login'),
@@ -31,7 +32,11 @@ urlpatterns = [
     path("orders/", UserOrdersView.as_view(), name="user-orders"),
     path('templates/', TemplateListView.as_view(), name='template-list'),
   path('messages/<str:email>/', MessageHistoryView.as_view(), name='message-history'),
+    path('messages/<str:email>/read/', MarkReadView.as_view(), name='message-mark-read'),
+    path('conversations/', ConversationListView.as_view(), name='conversation-list'),
     path('unread-count/', UnreadCountView.as_view(), name='unread-count'),
+    path('ws-ticket/', WebSocketTicketView.as_view(), name='ws-ticket'),
     path('contact-message/',ContactMessageCreateView.as_view(),name='contact-message'),
+    path('webhooks/brevo/', BrevoWebhookView.as_view(), name='brevo-webhook'),
 ]
 
@@ -0,0 +1,157 @@
+# chat/buffer.py
+import asyncio
+import logging
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .conversations import assign_sequence, record_conversations
+from .models import Message, conversation_key_for
+from .unread import record_new_messages
+
+logger = logging.getLogger(__name__)
+
+
+class BufferFull(Exception):
+    """Too many messages are waiting to be written; the caller should back off."""
+
+
+class MessageWriteBuffer:
+    """
+    Write-behind buffer for chat messages.
+
+    Consumers hand over (sender_id, receiver_id, content) and await the
+    saved message's id, sequence number and timestamp. Messages are
+    collected per process and inserted with one bulk_create once
+    CHAT_WRITE_BUFFER_SIZE messages are waiting or CHAT_WRITE_BUFFER_DELAY
+    seconds after the first one, whichever comes first. Under load that turns N inserts and N thread
+    hops into one; an idle chat waits at most the delay.
+
+    The buffer belongs to the event loop that first used it (one per ASGI
+    worker). close() flushes what is left; the lifespan handler calls it
+    on shutdown.
+    """
+
+    def __init__(self, max_size=None, max_delay=None, max_in_flight=None):
+        self.max_size = max_size or getattr(settings, 'CHAT_WRITE_BUFFER_SIZE', 100)
+        self.max_delay = max_delay if max_delay is not None else getattr(settings, 'CHAT_WRITE_BUFFER_DELAY', 0.02)
+        self.max_in_flight = max_in_flight or getattr(settings, 'CHAT_MAX_PENDING_WRITES', 2000)
+        # Messages handed over and not yet saved (queued or being written)
+        self.in_flight = 0
+        self._pending = []
+        self._timer = None
+        self._flush_lock = None
+        self._loop = None
+        self._closed = False
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+            self._flush_lock = asyncio.Lock()
+        return loop
+
+    async def add(self, sender_id, receiver_id, content):
+        """
+        Queue a message; returns (id, seq, timestamp) once it is in the
+        database. Raises BufferFull when CHAT_MAX_PENDING_WRITES messages of
+        this process are still waiting, instead of queueing without bound.
+        """
+        if self._closed:
+            raise RuntimeError("Message buffer is closed")
+        if self.in_flight >= self.max_in_flight:
+            raise BufferFull(f"{self.in_flight} chat messages waiting to be written")
+
+        loop = self._bind_loop()
+        future = loop.create_future()
+        message = Message(
+            sender_id=sender_id,
+            receiver_id=receiver_id,
+            conversation_key=conversation_key_for(sender_id, receiver_id),
+            content=content,
+        )
+        self._pending.append((message, future))
+
+        if len(self._pending) >= self.max_size:
+            self._schedule(0)
+        elif self._timer is None:
+            self._schedule(self.max_delay)
+
+        self.in_flight += 1
+        try:
+            return await future
+        finally:
+            self.in_flight -= 1
+
+    def _schedule(self, delay):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self._loop.call_later(delay, lambda: self._loop.create_task(self.flush()))
+
+    async def flush(self):
+        # One flush at a time keeps inserts in arrival order
+        async with self._flush_lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+
+            messages = [message for message, _ in batch]
+            try:
+                await database_sync_to_async(self._insert)(messages)
+            except Exception as e:
+                logger.error(f"[ERROR] Could not save {len(batch)} chat messages: {str(e)}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return 0
+
+            for message, future in batch:
+                if future.done():
+                    continue
+                if message.pk is None:
+                    future.set_exception(IntegrityError("Chat message could not be saved"))
+                else:
+                    future.set_result((message.pk, message.seq, message.timestamp))
+
+            # Anything that arrived while we were writing gets its own timer
+            if self._pending and self._timer is None:
+                self._schedule(0 if len(self._pending) >= self.max_size else self.max_delay)
+            return len(batch)
+
+    @staticmethod
+    def _insert(messages):
+        try:
+            with transaction.atomic():
+                assign_sequence(messages)
+                # Postgres (and SQLite 3.35+) return the new ids
+                Message.objects.bulk_create(messages)
+                record_new_messages(messages)
+                record_conversations(messages)
+        except IntegrityError:
+            # One bad row (e.g. a deleted receiver) must not lose the rest
+            for message in messages:
+                message.pk = message.seq = None
+                try:
+                    with transaction.atomic():
+                        # save() numbers the message and updates its
+                        # conversation and unread counter
+                        message.save(force_insert=True)
+                except IntegrityError as e:
+                    message.pk = message.seq = None
+                    logger.warning(f"[WARNING] Dropped chat message from user {message.sender_id}: {str(e)}")
+
+    async def close(self):
+        """Flush everything still buffered and refuse new messages."""
+        self._closed = True
+        if self._loop is asyncio.get_running_loop() and self._pending:
+            flushed = await self.flush()
+            logger.info(f"Flushed {flushed} buffered chat messages on shutdown")
+
+
+message_buffer = MessageWriteBuffer()
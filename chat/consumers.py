@@ -1,66 +1,446 @@
+import asyncio
 import json
+import logging
+import time
+from urllib.parse import parse_qs
+from asgiref.sync import async_to_sync
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
-from .models import Message
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.exceptions import ValidationError
+from . import framing, heartbeat, limits
+from .buffer import BufferFull, message_buffer
+from .conversations import messages_since
+from .middleware import get_user
+from .models import conversation_key_for
+from .pagination import decode_cursor
+from .unread import mark_read
 
-User = get_user_model()
+logger = logging.getLogger(__name__)
+
+# Idempotency keys are kept this long (seconds) for client retries
+CLIENT_ID_TTL = getattr(settings, 'CHAT_CLIENT_ID_TTL', 600)
+CLIENT_ID_MAX_LENGTH = 64
+PENDING = "pending"
+# Most messages replayed by one sync; clients page further through the history API
+SYNC_MAX_MESSAGES = getattr(settings, 'CHAT_SYNC_MAX_MESSAGES', 500)
+# Whether ws/chat/<user_id>/ sockets are served; they get events through
+# their conversation's group, which costs one more group_send per event
+LEGACY_SOCKETS = getattr(settings, 'CHAT_LEGACY_SOCKETS', True)
+
+
+def user_group(user_id):
+    """Channel layer group of all of a user's sockets."""
+    return f"user_{user_id}"
+
+
+def participants(conversation_key):
+    low, high = conversation_key.split("_")
+    return {int(low), int(high)}
+
+
+def conversation_group(conversation_key):
+    """Channel layer group of the legacy per-conversation sockets."""
+    return f"conversation_{conversation_key}"
+
+
+async def send_to_participants(conversation_key, event):
+    """
+    Deliver a group event to every socket of both participants: one
+    group_send per participant's user group, plus the conversation group
+    while legacy sockets are served, all in parallel. Every socket gets
+    the event once.
+    """
+    channel_layer = get_channel_layer()
+    groups = [user_group(user_id) for user_id in participants(conversation_key)]
+    if LEGACY_SOCKETS:
+        groups.append(conversation_group(conversation_key))
+    await asyncio.gather(*(channel_layer.group_send(group, event) for group in groups))
+
+
+def notify_user(user_id, data):
+    """Push a notification frame to every socket of a user (sync code)."""
+    event = {"type": "notification", "frame": framing.encode({"type": "notification", "data": data})}
+    async_to_sync(get_channel_layer().group_send)(user_group(user_id), event)
+
+
+def message_frame(message):
+    """Client frame of a message (a dict with the Message fields)."""
+    return {
+        "type": "message",
+        "id": message["id"],
+        "seq": message.get("seq"),
+        "client_id": message.get("client_id"),
+        "conversation_key": message["conversation_key"],
+        "content": message["content"],
+        "sender_id": message["sender_id"],
+        "receiver_id": message["receiver_id"],
+        "timestamp": message["timestamp"]
+    }
+
+
+def chat_message_event(message):
+    # Encoded here, once per message, not once per receiving socket
+    return {
+        "type": "chat_message",
+        "conversation_key": message["conversation_key"],
+        "frame": framing.encode(message_frame(message)),
+    }
+
+
+def read_receipt_event(reader_id, conversation_key, up_to, count):
+    """Group event telling the conversation that ``reader_id`` read up to a cursor."""
+    return {
+        "type": "read_receipt",
+        "conversation_key": conversation_key,
+        "frame": framing.encode({
+            "type": "read_receipt",
+            "reader_id": reader_id,
+            "conversation_key": conversation_key,
+            "up_to": up_to,
+            "count": count,
+        }),
+    }
+
+
+class UserChatConsumer(AsyncWebsocketConsumer):
+    """
+    One socket per user for all of their conversations: ws/chat/
+
+    The socket joins the user's group only; every frame names its
+    conversation_key. Client frames:
+
+        {"type": "message", "to": <user id>, "content": ..., "client_id": ...}
+        {"type": "read", "conversation_key": "2_7", "up_to": <cursor>}
+        {"type": "sync", "conversation_key": "2_7", "since_seq": 41}
+
+    ("conversation_key" or "to" select the conversation in any frame.)
+    Server frames have type "message", "synced", "read_receipt",
+    "notification", "ping" or "error". Frames are JSON text by default, or
+    binary MessagePack with epoch-millisecond timestamps when the client
+    asks for it (see chat/framing.py).
+
+    Heartbeat: the server sends {"type": "ping"} every
+    CHAT_HEARTBEAT_INTERVAL seconds and the client answers
+    {"type": "pong"}. A socket with no client frame for
+    CHAT_HEARTBEAT_TIMEOUT seconds is closed with 4408 and leaves its group.
+
+    Messages carry ``seq``, their gap-free position in the conversation. A
+    client that reconnects sends "sync" with the last seq it has and gets
+    the missed messages, then {"type": "synced", "last_seq": ...,
+    "has_more": ...}. Live messages may overlap the replay; drop repeated
+    seqs.
+    """
+
+    # Whether this socket is pinged and reaped when it goes quiet
+    heartbeat = True
+    heartbeat_task = None
 
-class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
-        self.room_name = None
+        self.group_name = None
         self.user = self.scope["user"]
-        self.chat_user_id = self.scope['url_route']['kwargs'].get('user_id')
-
-        if self.chat_user_id is None or self.user.is_anonymous:
+        if self.user.is_anonymous:
             await self.close()
             return
 
-        self.chat_user_id = int(self.chat_user_id)
-        self.room_name = f"chat_{min(self.user.id, self.chat_user_id)}_{max(self.user.id, self.chat_user_id)}"
+        self.bucket = limits.TokenBucket()
+        self.strikes = 0
+        self.format, subprotocol = framing.negotiate(self.scope)
+        self.group_name = self.get_group_name()
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept(subprotocol=subprotocol)
 
-        await self.channel_layer.group_add(self.room_name, self.channel_name)
-        await self.accept()
+        heartbeat.stats.record_open()
+        self.last_seen = time.monotonic()
+        if self.heartbeat:
+            self.heartbeat_task = asyncio.create_task(self.keep_alive())
 
     async def disconnect(self, close_code):
-        if self.room_name:
-            await self.channel_layer.group_discard(self.room_name, self.channel_name)
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+        if self.group_name:
+            group_name, self.group_name = self.group_name, None
+            heartbeat.stats.record_close()
+            await self.channel_layer.group_discard(group_name, self.channel_name)
+
+    async def keep_alive(self):
+        while True:
+            await asyncio.sleep(heartbeat.HEARTBEAT_INTERVAL)
+            if time.monotonic() - self.last_seen > heartbeat.HEARTBEAT_TIMEOUT:
+                break
+            try:
+                await self.send_frame({"type": "ping"})
+            except Exception as e:
+                # The socket is gone but its disconnect has not arrived
+                logger.warning(f"[WARNING] Heartbeat ping to user {self.user.id} failed: {str(e)}")
+                break
+        try:
+            await self.reap()
+        except Exception as e:
+            logger.warning(f"[WARNING] Closing dead socket of user {self.user.id} failed: {str(e)}")
+
+    async def reap(self):
+        # Leave the group now; on a half-open socket the disconnect event
+        # only arrives once the server gives up on the close handshake
+        self.heartbeat_task = None
+        group_name, self.group_name = self.group_name, None
+        try:
+            if group_name:
+                heartbeat.stats.record_close(reaped=True)
+                await self.channel_layer.group_discard(group_name, self.channel_name)
+        finally:
+            await self.close(code=heartbeat.CLOSE_HEARTBEAT_TIMEOUT)
 
-    async def receive(self, text_data):
-        data = json.loads(text_data)
+    async def receive(self, text_data=None, bytes_data=None):
+        self.last_seen = time.monotonic()
+        # Cheap checks first: size, then rate, before any parsing or DB work
+        frame = text_data if text_data is not None else bytes_data
+        if limits.frame_too_large(frame):
+            limits.stats.record(limits.TOO_LARGE)
+            await self.close(code=limits.CLOSE_TOO_LARGE)
+            return
+
+        retry_after = self.bucket.take()
+        if retry_after:
+            await self.reject(limits.CONNECTION_RATE_LIMITED, "Rate limit exceeded.", retry_after)
+            return
+        if not await limits.allow_user_frame(self.user.id):
+            await self.reject(limits.USER_RATE_LIMITED, "Rate limit exceeded.", 1)
+            return
+
+        try:
+            if text_data is not None:
+                data = json.loads(text_data)
+            elif self.format == framing.MSGPACK:
+                data = framing.decode_msgpack(bytes_data)
+            else:
+                data = None
+        except framing.DECODE_ERRORS:
+            data = None
+        if not isinstance(data, dict):
+            await self.reject(limits.INVALID, "Invalid frame.")
+            return
+        self.strikes = 0
+        if data.get('type') == 'pong':
+            return
+
+        peer_id = await self.get_peer_id(data)
+        if peer_id is None:
+            await self.send_error("Unknown conversation.", data)
+            return
+
+        if data.get('type') == 'read':
+            await self.mark_read(peer_id, data.get('up_to'))
+        elif data.get('type') == 'sync':
+            await self.sync(peer_id, data.get('since_seq'))
+        else:
+            await self.send_message(peer_id, data)
+
+    async def get_peer_id(self, data):
+        # Checked against the user cache, so saving a message needs no user lookups
+        peer_id = data.get('to')
+        key = data.get('conversation_key')
+        if peer_id is None and isinstance(key, str):
+            ids = key.split("_")
+            if len(ids) == 2 and str(self.user.id) in ids:
+                ids.remove(str(self.user.id))
+                peer_id = ids[0]
+        try:
+            peer_id = int(peer_id)
+        except (TypeError, ValueError):
+            return None
+        return peer_id if await get_user(peer_id) is not None else None
+
+    def get_group_name(self):
+        """Channel layer group this socket receives its events from."""
+        return user_group(self.user.id)
+
+    async def reject(self, reason, error, retry_after=None):
+        """Count a rejected frame; answer with an error frame, or close the
+        socket after CHAT_RATE_LIMIT_STRIKES rejections in a row."""
+        limits.stats.record(reason)
+        self.strikes += 1
+        if self.strikes >= limits.MAX_STRIKES:
+            limits.stats.record(limits.CLOSED)
+            await self.close(code=limits.CLOSE_POLICY_VIOLATION)
+            return
+        frame = {"type": "error", "error": error}
+        if retry_after:
+            frame["retry_after"] = round(retry_after, 3)
+        await self.send_frame(frame)
+
+    async def send_error(self, error, data):
+        await self.send_frame({
+            "type": "error",
+            "error": error,
+            "client_id": data.get('client_id'),
+            "conversation_key": data.get('conversation_key'),
+        })
+
+    async def send_message(self, peer_id, data):
         message = data.get('content', '')
+        # Optional idempotency key chosen by the client; a resend with the
+        # same key is acknowledged but not saved or broadcast again
+        client_id = data.get('client_id')
+        if client_id is not None:
+            client_id = str(client_id)[:CLIENT_ID_MAX_LENGTH]
+
+        if not isinstance(message, str) or message.strip() == '':
+            return
 
-        if message.strip() == '':
+        dedupe_key = f"chat:client-id:{self.user.id}:{client_id}" if client_id else None
+        if dedupe_key and not await cache.aadd(dedupe_key, PENDING, CLIENT_ID_TTL):
+            saved = await cache.aget(dedupe_key)
+            if saved and saved != PENDING:
+                # Already delivered: repeat the ack to this socket only
+                await self.send_frame({**message_frame(saved), "duplicate": True})
+            # Still pending: the original's broadcast reaches this socket too
             return
 
-        # Save to DB
-        timestamp = await self.save_message(self.user.id, self.chat_user_id, message)
+        # Save to DB (batched with other messages, see chat/buffer.py)
+        key = conversation_key_for(self.user.id, peer_id)
+        try:
+            message_id, seq, timestamp = await message_buffer.add(self.user.id, peer_id, message)
+        except BufferFull:
+            # Backpressure: the database is behind, the client should retry later
+            limits.stats.record(limits.BUSY)
+            if dedupe_key:
+                await cache.adelete(dedupe_key)
+            await self.send_frame({
+                "type": "error",
+                "error": "Server busy, retry later.",
+                "client_id": client_id,
+                "conversation_key": key,
+                "retry_after": 1,
+            })
+            return
+        except Exception as e:
+            logger.error(f"[ERROR] Chat message from user {self.user.id} not saved: {str(e)}")
+            if dedupe_key:
+                await cache.adelete(dedupe_key)
+            await self.send_error("Message could not be saved.", {"client_id": client_id, "conversation_key": key})
+            return
+
+        event = {
+            "id": message_id,
+            "seq": seq,
+            "client_id": client_id,
+            "conversation_key": key,
+            "content": message,
+            "sender_id": self.user.id,
+            "receiver_id": peer_id,
+            "timestamp": timestamp
+        }
+        if dedupe_key:
+            await cache.aset(dedupe_key, event, CLIENT_ID_TTL)
+
+        # The only broadcast of this message (to both users, including the sender)
+        await send_to_participants(key, chat_message_event(event))
+
+    async def send_frame(self, frame):
+        """Encode a frame for this socket alone and send it."""
+        if self.format == framing.MSGPACK:
+            await self.send(bytes_data=framing.encode_msgpack(frame))
+        else:
+            await self.send(text_data=framing.encode_json(frame))
 
-        # Broadcast to group (including sender)
-        await self.channel_layer.group_send(
-            self.room_name,
-            {
-                "type": "chat_message",
-                "content": message,
-                "sender_id": self.user.id,
-                "receiver_id": self.chat_user_id,
-                "timestamp": timestamp
-            }
-        )
+    async def send_payload(self, frame):
+        """Send a group event's pre-encoded frame in this socket's format."""
+        if self.format == framing.MSGPACK:
+            await self.send(bytes_data=frame["payload"])
+        else:
+            # Hashable for the memo in payload_to_json()
+            await self.send(text_data=framing.payload_to_json(frame["payload"], tuple(frame["datetimes"])))
 
     async def chat_message(self, event):
-        # Send message to WebSocket
-        await self.send(text_data=json.dumps({
-            "content": event["content"],
-            "sender_id": event["sender_id"],
-            "receiver_id": event["receiver_id"],
-            "timestamp": event["timestamp"]
-        }))
-
-    @database_sync_to_async
-    def save_message(self, sender_id, receiver_id, content):
-        sender = User.objects.get(id=sender_id)
-        receiver = User.objects.get(id=receiver_id)
-        msg = Message.objects.create(sender=sender, receiver=receiver, content=content)
-        return msg.timestamp.isoformat()
+        await self.send_payload(event["frame"])
+
+    async def sync(self, peer_id, since_seq):
+        key = conversation_key_for(self.user.id, peer_id)
+        try:
+            since_seq = max(0, int(since_seq))
+        except (TypeError, ValueError):
+            await self.send_error("since_seq must be a number.", {"conversation_key": key})
+            return
+
+        messages, has_more = await database_sync_to_async(messages_since)(key, since_seq, SYNC_MAX_MESSAGES)
+        for message in messages:
+            await self.send_frame(message_frame({
+                "id": message.pk,
+                "seq": message.seq,
+                "conversation_key": key,
+                "content": message.content,
+                "sender_id": message.sender_id,
+                "receiver_id": message.receiver_id,
+                "timestamp": message.timestamp,
+            }))
+        await self.send_frame({
+            "type": "synced",
+            "conversation_key": key,
+            "last_seq": messages[-1].seq if messages else since_seq,
+            "has_more": has_more,
+        })
+
+    async def mark_read(self, peer_id, up_to):
+        try:
+            timestamp, pk = decode_cursor(str(up_to or ''))
+        except ValidationError:
+            await self.send_error("Invalid cursor.", {"conversation_key": conversation_key_for(self.user.id, peer_id)})
+            return
+
+        marked = await database_sync_to_async(mark_read)(self.user.id, peer_id, timestamp, pk)
+        if marked:
+            # One receipt for the whole range, however many messages it covered
+            key = conversation_key_for(self.user.id, peer_id)
+            await send_to_participants(key, read_receipt_event(self.user.id, key, up_to, marked))
+
+    async def read_receipt(self, event):
+        await self.send_payload(event["frame"])
+
+    async def notification(self, event):
+        await self.send_payload(event["frame"])
+
+
+class ChatConsumer(UserChatConsumer):
+    """
+    Legacy socket for a single conversation: ws/chat/<user_id>/
+
+    Frames need no "to"/"conversation_key", and only events of this
+    conversation are forwarded. ws/chat/<user_id>/?since_seq=41 replays the
+    missed messages before any live message. Older clients do not answer
+    pings, so the heartbeat is opt-in here (?heartbeat=1). Prefer ws/chat/,
+    which carries every conversation on one connection.
+    """
+
+    async def connect(self):
+        self.group_name = None
+        self.user = self.scope["user"]
+        if self.user.is_anonymous:
+            await self.close()
+            return
+
+        self.chat_user_id = await self.get_peer_id({'to': self.scope['url_route']['kwargs'].get('user_id')})
+        if self.chat_user_id is None:
+            await self.close()
+            return
+
+        self.conversation_key = conversation_key_for(self.user.id, self.chat_user_id)
+        params = parse_qs(self.scope.get("query_string", b"").decode())
+        self.heartbeat = params.get("heartbeat") == ["1"]
+        await super().connect()
+
+        # Group events wait until connect() returns, so the replay comes first
+        since_seq = params.get("since_seq")
+        if since_seq:
+            await self.sync(self.chat_user_id, since_seq[0])
+
+    async def get_peer_id(self, data):
+        if getattr(self, 'chat_user_id', None) is not None:
+            return self.chat_user_id
+        return await super().get_peer_id(data)
 
+    def get_group_name(self):
+        # Only this conversation's events, not every event of the user
+        return conversation_group(self.conversation_key)
@@ -0,0 +1,114 @@
+# chat/conversations.py
+"""
+Conversation read model for the inbox.
+
+Every message insert runs assign_sequence() and record_conversations() in
+its transaction: the first numbers the messages within their conversation
+(Message.seq), the second moves the conversation's "last message"
+forward. The inbox reads Conversation rows only, never Message.
+"""
+from django.db.models import Q
+
+from .models import Conversation, Message
+from .pagination import decode_cursor
+
+PREVIEW_LENGTH = Conversation._meta.get_field('last_message_preview').max_length
+
+
+def _preview(content):
+    content = " ".join(content.split())
+    if len(content) <= PREVIEW_LENGTH:
+        return content
+    return content[:PREVIEW_LENGTH - 1] + "…"
+
+
+def assign_sequence(messages):
+    """
+    Give unsaved messages the next sequence numbers of their conversations.
+
+    Must run inside the transaction that inserts the messages: the
+    conversation rows stay locked until it commits, so numbers are handed
+    out in commit order without gaps, and a rollback gives them back.
+    """
+    first = {}
+    for message in messages:
+        first.setdefault(message.conversation_key, message)
+
+    Conversation.objects.bulk_create(
+        [
+            Conversation(
+                conversation_key=key,
+                user_low_id=min(message.sender_id, message.receiver_id),
+                user_high_id=max(message.sender_id, message.receiver_id),
+            )
+            for key, message in first.items()
+        ],
+        ignore_conflicts=True,
+    )
+    # Fixed lock order, so two batches touching the same conversations cannot deadlock
+    last_seq = dict(
+        Conversation.objects.select_for_update()
+        .filter(conversation_key__in=first)
+        .order_by('conversation_key')
+        .values_list('conversation_key', 'last_seq')
+    )
+    for message in messages:
+        last_seq[message.conversation_key] += 1
+        message.seq = last_seq[message.conversation_key]
+
+
+def record_conversations(messages):
+    """
+    Make saved messages the last message of their conversations. Runs in
+    the inserting transaction, after assign_sequence().
+    """
+    latest = {}
+    for message in messages:
+        if message.pk and (message.conversation_key not in latest or message.seq > latest[message.conversation_key].seq):
+            latest[message.conversation_key] = message
+
+    for key, message in latest.items():
+        Conversation.objects.filter(conversation_key=key).update(
+            last_seq=message.seq,
+            last_message_id=message.pk,
+            last_sender_id=message.sender_id,
+            last_message_preview=_preview(message.content),
+            last_message_at=message.timestamp,
+        )
+
+
+def get_inbox_page(user_id, before=None, limit=50):
+    """
+    The user's conversations with the most recent activity first, older
+    than the ``before`` cursor. Returns (conversations, has_more).
+
+    A user is either the low or the high participant, so each side is read
+    with its own index range (limit + 1 rows) and the two are merged.
+    """
+    sides = []
+    for field in ('user_low', 'user_high'):
+        queryset = (
+            Conversation.objects.filter(**{field: user_id}, last_message_at__isnull=False)
+            .select_related('user_high' if field == 'user_low' else 'user_low')
+        )
+        if field == 'user_high':
+            # A conversation with oneself is already on the low side
+            queryset = queryset.exclude(user_low=user_id)
+        if before:
+            timestamp, pk = decode_cursor(before)
+            queryset = queryset.filter(Q(last_message_at__lt=timestamp) | Q(last_message_at=timestamp, id__lt=pk))
+        sides.extend(queryset.order_by('-last_message_at', '-id')[:limit + 1])
+
+    sides.sort(key=lambda conversation: (conversation.last_message_at, conversation.id), reverse=True)
+    return sides[:limit], len(sides) > limit
+
+
+def messages_since(conversation_key, since_seq, limit):
+    """
+    Messages of a conversation after ``since_seq``, in order, read with one
+    range of the (conversation_key, seq) index. Returns (messages, has_more).
+    """
+    messages = list(
+        Message.objects.filter(conversation_key=conversation_key, seq__gt=since_seq).order_by('seq')[:limit + 1]
+    )
+    return messages[:limit], len(messages) > limit
@@ -0,0 +1,84 @@
+# chat/framing.py
+"""
+Wire formats for chat WebSocket frames.
+
+Frames are dicts whose datetimes are encoded per format:
+
+    json     text frames, datetimes as ISO 8601 strings (the default)
+    msgpack  binary MessagePack frames, datetimes as integer epoch
+             milliseconds; chosen with the "framestack.msgpack"
+             subprotocol or ?format=msgpack
+
+Fan-out events carry the frame encoded once, as MessagePack (encode()).
+MessagePack sockets send those bytes as they are; JSON sockets convert
+them with payload_to_json(), which is memoized so the sockets of one
+process convert a group event once. Datetimes in those JSON frames have
+millisecond precision, as in the MessagePack ones.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+import msgpack
+
+JSON = "json"
+MSGPACK = "msgpack"
+MSGPACK_SUBPROTOCOL = "framestack.msgpack"
+
+
+def epoch_ms(value):
+    return int(value.timestamp() * 1000)
+
+
+def _convert(frame, convert_datetime):
+    return {key: convert_datetime(value) if isinstance(value, datetime) else value for key, value in frame.items()}
+
+
+def encode_json(frame):
+    return json.dumps(_convert(frame, datetime.isoformat))
+
+
+def encode_msgpack(frame):
+    return msgpack.packb(_convert(frame, epoch_ms), use_bin_type=True)
+
+
+def encode(frame):
+    """
+    The frame of a group event: its MessagePack encoding plus the keys
+    holding datetimes, which payload_to_json() turns back into ISO 8601.
+    """
+    return {
+        "payload": encode_msgpack(frame),
+        "datetimes": [key for key, value in frame.items() if isinstance(value, datetime)],
+    }
+
+
+def from_epoch_ms(value):
+    return datetime.fromtimestamp(value // 1000, tz=timezone.utc) + timedelta(milliseconds=value % 1000)
+
+
+@lru_cache(maxsize=1024)
+def payload_to_json(payload, datetimes):
+    """The JSON text frame of an encode() payload; ``datetimes`` is a tuple."""
+    frame = decode_msgpack(payload)
+    for key in datetimes:
+        frame[key] = from_epoch_ms(frame[key])
+    return encode_json(frame)
+
+
+# What decoding a malformed client frame can raise: bad syntax, deep
+# nesting (RecursionError from json), unhashable msgpack map keys
+DECODE_ERRORS = (ValueError, TypeError, RecursionError, msgpack.UnpackException)
+
+
+def decode_msgpack(data):
+    return msgpack.unpackb(data, raw=False)
+
+
+def negotiate(scope):
+    """(format, subprotocol to accept) for a WebSocket handshake."""
+    if MSGPACK_SUBPROTOCOL in scope.get("subprotocols", []):
+        return MSGPACK, MSGPACK_SUBPROTOCOL
+    if b"format=msgpack" in scope.get("query_string", b"").split(b"&"):
+        return MSGPACK, None
+    return JSON, None
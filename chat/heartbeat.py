@@ -0,0 +1,48 @@
+# chat/heartbeat.py
+import threading
+
+from django.conf import settings
+
+# Seconds between server pings, and seconds of silence before a socket is
+# treated as dead (any client frame, not only a pong, counts as alive)
+HEARTBEAT_INTERVAL = getattr(settings, 'CHAT_HEARTBEAT_INTERVAL', 25)
+HEARTBEAT_TIMEOUT = getattr(settings, 'CHAT_HEARTBEAT_TIMEOUT', 60)
+
+# Close code sent to a socket that missed its heartbeats
+CLOSE_HEARTBEAT_TIMEOUT = 4408
+
+
+class ConnectionStats:
+    """
+    Chat sockets of this process: ``live`` is a gauge of open sockets,
+    ``opened`` and ``reaped`` count since start. Reaped sockets were closed
+    by the server for missing heartbeats.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.live = 0
+        self.opened = 0
+        self.reaped = 0
+
+    def record_open(self):
+        with self._lock:
+            self.live += 1
+            self.opened += 1
+
+    def record_close(self, reaped=False):
+        with self._lock:
+            self.live -= 1
+            if reaped:
+                self.reaped += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"live": self.live, "opened": self.opened, "reaped": self.reaped}
+
+
+stats = ConnectionStats()
+
+
+def connection_stats():
+    return stats.snapshot()
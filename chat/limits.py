@@ -0,0 +1,101 @@
+# chat/limits.py
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Largest WebSocket frame accepted, in bytes (UTF-8 for text frames)
+MAX_FRAME_SIZE = getattr(settings, 'CHAT_MAX_FRAME_SIZE', 16384)
+# Sustained frames per second and burst allowance for one connection
+CONNECTION_RATE = getattr(settings, 'CHAT_CONNECTION_RATE', 10)
+CONNECTION_BURST = getattr(settings, 'CHAT_CONNECTION_BURST', 20)
+# Frames per second for one user across all sockets and workers
+USER_RATE = getattr(settings, 'CHAT_USER_RATE', 30)
+# Rejected frames in a row before the socket is closed
+MAX_STRIKES = getattr(settings, 'CHAT_RATE_LIMIT_STRIKES', 20)
+
+# Rejection reasons
+TOO_LARGE = "too_large"
+INVALID = "invalid"
+CONNECTION_RATE_LIMITED = "connection_rate"
+USER_RATE_LIMITED = "user_rate"
+BUSY = "busy"
+CLOSED = "closed"
+
+# WebSocket close codes
+CLOSE_TOO_LARGE = 1009
+CLOSE_POLICY_VIOLATION = 1008
+
+
+def frame_too_large(frame):
+    """Whether a text (str) or binary frame is over MAX_FRAME_SIZE bytes."""
+    if isinstance(frame, str):
+        # At most 4 UTF-8 bytes per character: only encode when it may matter
+        if len(frame) * 4 <= MAX_FRAME_SIZE:
+            return False
+        return len(frame.encode('utf-8')) > MAX_FRAME_SIZE
+    return len(frame) > MAX_FRAME_SIZE
+
+
+class ChatLimitStats:
+    """Thread-safe counters of frames rejected by the chat limits."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys((TOO_LARGE, INVALID, CONNECTION_RATE_LIMITED, USER_RATE_LIMITED, BUSY, CLOSED), 0)
+
+    def record(self, reason):
+        with self._lock:
+            self.counts[reason] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+stats = ChatLimitStats()
+
+
+def chat_limit_stats():
+    return stats.snapshot()
+
+
+class TokenBucket:
+    """
+    Per-connection rate limit: ``rate`` tokens per second, up to ``burst``
+    saved. Lives on the consumer, so it needs no locking.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate if rate is not None else CONNECTION_RATE
+        self.burst = burst if burst is not None else CONNECTION_BURST
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+
+    def take(self):
+        """Take one token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+async def allow_user_frame(user_id):
+    """
+    Count a frame against the user's per-second budget in the shared cache.
+    Fails open if the cache is down.
+    """
+    key = f"chat:rate:{user_id}:{int(time.time())}"
+    try:
+        await cache.aadd(key, 0, 2)
+        return await cache.aincr(key) <= USER_RATE
+    except Exception as e:
+        logger.error(f"[ERROR] Chat rate limit cache unavailable: {str(e)}")
+        return True
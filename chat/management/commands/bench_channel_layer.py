@@ -0,0 +1,103 @@
+# management/commands/bench_channel_layer.py
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from ...consumers import chat_message_event
+
+BASELINE = 'memory'
+
+
+def layer_config(backend):
+    if backend == BASELINE:
+        return {'BACKEND': 'channels.layers.InMemoryChannelLayer'}
+    try:
+        return settings.CHANNEL_LAYER_CONFIGS[backend]
+    except KeyError:
+        raise CommandError(f"Unknown channel layer backend '{backend}'")
+
+
+class Command(BaseCommand):
+    help = "Measure group_send latency and throughput of the channel layer backends (CHANNEL_LAYER_CONFIGS)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('backends', nargs='*', default=[BASELINE, 'local'],
+                            help="memory (channels' InMemoryChannelLayer), local, redis or postgres")
+        parser.add_argument('--receivers', type=int, default=2,
+                            help="Sockets in the group (one user's tabs and devices)")
+        parser.add_argument('--messages', type=int, default=2000)
+        parser.add_argument('--idle-groups', type=int, default=2000,
+                            help="Other sockets connected to the process, each in its own group")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'backend':<10} {'p50 ms':>8} {'p99 ms':>8} {'deliveries/s':>13}")
+        for backend in options['backends']:
+            config = layer_config(backend)
+            try:
+                latencies, throughput = asyncio.run(self._bench(config, options))
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f"{backend:<10} failed: {str(e)}"))
+                continue
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[int(len(latencies) * 0.99)] * 1000
+            self.stdout.write(f"{backend:<10} {p50:>8.3f} {p99:>8.3f} {throughput:>13.0f}")
+
+    async def _bench(self, config, options):
+        receivers = options['receivers']
+        messages = options['messages']
+        # Room for the whole throughput run in every receiver's queue
+        layer = import_string(config['BACKEND'])(**{**config.get('CONFIG', {}), 'capacity': messages + 10})
+        group = "bench_group"
+        event = chat_message_event({
+            "id": 1234567,
+            "seq": 4821,
+            "client_id": "c0f1e2d3-a4b5-4c6d-8e7f-0123456789ab",
+            "conversation_key": "1042_2077",
+            "content": "Hi! I've uploaded the new hero images, can you check the layout on mobile before we publish?",
+            "sender_id": 1042,
+            "receiver_id": 2077,
+            "timestamp": timezone.now(),
+        })
+
+        try:
+            await layer.flush()
+            idle = [await layer.new_channel() for _ in range(options['idle_groups'])]
+            for index, channel in enumerate(idle):
+                await layer.group_add(f"bench_idle_{index}", channel)
+            channels = [await layer.new_channel() for _ in range(receivers)]
+            for channel in channels:
+                await layer.group_add(group, channel)
+
+            # Latency: one message in flight at a time, until every receiver has it
+            latencies = []
+            for _ in range(min(messages, 1000)):
+                sent = time.perf_counter()
+                await layer.group_send(group, {**event, "sent": sent})
+                for channel in channels:
+                    await layer.receive(channel)
+                    latencies.append(time.perf_counter() - sent)
+
+            # Throughput: send back to back while the receivers drain
+            async def drain(channel):
+                for _ in range(messages):
+                    await layer.receive(channel)
+
+            started = time.perf_counter()
+            consumers = [asyncio.ensure_future(drain(channel)) for channel in channels]
+            for _ in range(messages):
+                await layer.group_send(group, event)
+            await asyncio.gather(*consumers)
+            throughput = messages * receivers / (time.perf_counter() - started)
+        finally:
+            await layer.flush()
+            if hasattr(layer, 'close'):
+                await layer.close()
+            elif hasattr(layer, 'close_pools'):
+                await layer.close_pools()
+        return latencies, throughput
@@ -0,0 +1,80 @@
+# management/commands/bench_chat_framing.py
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ... import framing
+from ...consumers import message_frame
+
+CONTENTS = {
+    'short': "ok, see you at 5",
+    'typical': "Hi! I've uploaded the new hero images, can you check the layout on mobile before we publish?",
+    'long': "Here is the full copy for the about page. " * 20,
+}
+
+
+def legacy_frame(message):
+    # What chat_message sent before framing.py: json.dumps per receiving socket
+    return json.dumps({**message_frame(message), "timestamp": message["timestamp"].isoformat()})
+
+
+class Command(BaseCommand):
+    help = "Compare bytes per chat message and encode CPU of the JSON and MessagePack frames"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+        parser.add_argument('--recipients', type=int, default=2,
+                            help="Sockets receiving each message (both participants' tabs and devices)")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        recipients = options['recipients']
+
+        self.stdout.write(f"{'message':<10} {'format':<10} {'bytes':>6} {'us/encode':>10}")
+        for name, content in CONTENTS.items():
+            message = self._message(content)
+            frame = message_frame(message)
+            for fmt, encode in ((framing.JSON, framing.encode_json), (framing.MSGPACK, framing.encode_msgpack)):
+                size = len(encode(frame).encode('utf-8') if fmt == framing.JSON else encode(frame))
+                seconds = self._cpu(lambda: encode(frame), iterations)
+                self.stdout.write(f"{name:<10} {fmt:<10} {size:>6} {seconds / iterations * 1e6:>10.2f}")
+
+        # Encode CPU of one group event delivered to ``recipients`` sockets
+        message = self._message(CONTENTS['typical'])
+        per_socket = self._cpu(lambda: [legacy_frame(message) for _ in range(recipients)], iterations)
+        once = self._cpu(lambda: framing.encode(message_frame(message)), iterations)
+
+        # A JSON socket's conversion: uncached (first socket in a process), memoized (the rest)
+        encoded = framing.encode(message_frame(message))
+        datetimes = tuple(encoded["datetimes"])
+        converted = self._cpu(lambda: framing.payload_to_json.__wrapped__(encoded["payload"], datetimes), iterations)
+        memoized = self._cpu(lambda: framing.payload_to_json(encoded["payload"], datetimes), iterations)
+
+        self.stdout.write("")
+        self.stdout.write(f"fan-out to {recipients} sockets, us of encode CPU per message:")
+        self.stdout.write(f"  JSON per socket (before)        {per_socket / iterations * 1e6:>8.2f}")
+        self.stdout.write(f"  msgpack once per event          {once / iterations * 1e6:>8.2f}")
+        self.stdout.write(f"  + JSON conversion per process   {converted / iterations * 1e6:>8.2f}")
+        self.stdout.write(f"  + JSON conversion, memoized     {memoized / iterations * 1e6:>8.2f}")
+
+    @staticmethod
+    def _message(content):
+        return {
+            "id": 1234567,
+            "seq": 4821,
+            "client_id": "c0f1e2d3-a4b5-4c6d-8e7f-0123456789ab",
+            "conversation_key": "1042_2077",
+            "content": content,
+            "sender_id": 1042,
+            "receiver_id": 2077,
+            "timestamp": timezone.now(),
+        }
+
+    @staticmethod
+    def _cpu(fn, iterations):
+        started = time.process_time()
+        for _ in range(iterations):
+            fn()
+        return time.process_time() - started
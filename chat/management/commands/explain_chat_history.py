@@ -0,0 +1,77 @@
+# management/commands/explain_chat_history.py
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from ...conversations import assign_sequence, record_conversations
+from ...models import Message, conversation_key_for
+from ...unread import record_new_messages
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Print the query plans for a chat history page, by participant pair and by conversation key"
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_a', type=int, help="Id of one participant")
+        parser.add_argument('user_b', type=int, help="Id of the other participant")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="First insert this many synthetic messages between random existing users")
+        parser.add_argument('--limit', type=int, default=50, help="Page size")
+
+    def handle(self, *args, **options):
+        user_a, user_b = options['user_a'], options['user_b']
+        if options['seed']:
+            self._seed(options['seed'], user_a, user_b)
+
+        old = Message.objects.filter(sender__in=[user_a, user_b], receiver__in=[user_a, user_b])
+        new = Message.objects.filter(conversation_key=conversation_key_for(user_a, user_b))
+
+        # Postgres runs the query for real; other backends only plan it
+        explain_options = {'analyze': True, 'buffers': True} if connection.vendor == 'postgresql' else {}
+        for label, queryset in (("participant pair", old), ("conversation key", new)):
+            page = queryset.order_by('-timestamp', '-id')[:options['limit'] + 1]
+            self.stdout.write(self.style.MIGRATE_HEADING(f"History by {label}:"))
+            self.stdout.write(page.explain(**explain_options))
+            self.stdout.write("")
+
+    def _seed(self, count, user_a, user_b):
+        if User.objects.filter(id__in=[user_a, user_b]).count() != 2:
+            raise CommandError("Both participants must be existing users.")
+        user_ids = list(User.objects.values_list('id', flat=True)[:1000])
+
+        batch = []
+        for i in range(count):
+            # Keep the explained conversation a small share of the table
+            if i % 1000 == 0:
+                sender, receiver = user_a, user_b
+            else:
+                sender, receiver = random.sample(user_ids, 2)
+            batch.append(Message(
+                sender_id=sender,
+                receiver_id=receiver,
+                conversation_key=conversation_key_for(sender, receiver),
+                content="seed",
+            ))
+            if len(batch) >= 10000:
+                self._insert(batch)
+                batch = []
+        if batch:
+            self._insert(batch)
+
+        # Fresh statistics so the planner sees the new row counts
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(self.style.SUCCESS(f"Inserted {count} synthetic messages."))
+
+    @staticmethod
+    def _insert(messages):
+        # Same bookkeeping as the chat write buffer (chat/buffer.py)
+        with transaction.atomic():
+            assign_sequence(messages)
+            Message.objects.bulk_create(messages)
+            record_new_messages(messages)
+            record_conversations(messages)
@@ -0,0 +1,12 @@
+# management/commands/reconcile_unread_counters.py
+from django.core.management.base import BaseCommand
+
+from ...unread import reconcile_unread_counters
+
+
+class Command(BaseCommand):
+    help = "Recount unread chat messages and correct unread counters that drifted"
+
+    def handle(self, *args, **options):
+        fixed = reconcile_unread_counters()
+        self.stdout.write(self.style.SUCCESS(f"{fixed} unread counters corrected."))
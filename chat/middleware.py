@@ -1,60 +1,122 @@
-# chat/middleware.py - UPDATED VERSION
+# chat/middleware.py
+import logging
+import threading
 from urllib.parse import parse_qs
+
 from channels.db import database_sync_to_async
-from django.contrib.auth import get_user_model
-from django.contrib.auth.models import AnonymousUser
-from jwt import decode as jwt_decode
 from django.conf import settings
-from django.utils.functional import SimpleLazyObject
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from utils.ttl_cache import TTLCache
+
+from .tickets import redeem_ticket
+
+logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+# Active users by id, so a reconnect storm does not turn into a query per socket.
+# A deactivated user can keep connecting for up to the TTL.
+user_cache = TTLCache(
+    maxsize=getattr(settings, 'CHAT_WS_USER_CACHE_SIZE', 10000),
+    ttl=getattr(settings, 'CHAT_WS_USER_CACHE_TTL', 60),
+)
+
+
+class WebSocketAuthStats:
+    """Thread-safe counters for WebSocket authentication outcomes."""
+
+    OUTCOMES = ('ticket', 'token', 'missing', 'invalid_ticket', 'invalid_token', 'unknown_user')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.OUTCOMES, 0)
+
+    def record(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        counts.update({
+            "user_cache_size": len(user_cache),
+            "user_cache_hits": user_cache.hits,
+            "user_cache_misses": user_cache.misses,
+        })
+        return counts
+
+
+stats = WebSocketAuthStats()
+
+
+def ws_auth_stats():
+    return stats.snapshot()
+
+
 @database_sync_to_async
-def get_user(user_id):
+def _load_user(user_id):
     try:
-        # Convert to int if it's a string
-        user_id = int(user_id) if isinstance(user_id, str) else user_id
-        return User.objects.get(id=user_id)
+        return User.objects.get(**{api_settings.USER_ID_FIELD: user_id}, is_active=True)
     except (User.DoesNotExist, ValueError, TypeError):
-        return AnonymousUser()
+        return None
+
+
+async def get_user(user_id):
+    """Active user by id from the user cache or the database; None if there is none."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await _load_user(user_id)
+        if user is not None:
+            user_cache.set(user_id, user)
+    return user
+
 
 class JWTAuthMiddleware:
     """
-    Extracts JWT token from query string and sets scope['user']
-    ws://localhost:8000/ws/chat/2/?token=ACCESS_TOKEN
+    Authenticates WebSocket connections and sets scope['user']
+    (AnonymousUser when authentication fails):
+
+        ws://localhost:8000/ws/chat/?ticket=TICKET        from api/v1/ws-ticket/
+        ws://localhost:8000/ws/chat/?token=ACCESS_TOKEN   SimpleJWT access token
     """
+
     def __init__(self, inner):
         self.inner = inner
 
-    def __call__(self, scope):
-        return JWTAuthMiddlewareInstance(scope, self.inner)
+    async def __call__(self, scope, receive, send):
+        user = await self.authenticate(scope)
+        return await self.inner(dict(scope, user=user), receive, send)
 
-class JWTAuthMiddlewareInstance:
-    def __init__(self, scope, inner):
-        self.scope = dict(scope)
-        self.inner = inner
-
-    async def __call__(self, receive, send):
-        query_string = self.scope.get("query_string", b"").decode()
-        token = parse_qs(query_string).get("token")
-        user = AnonymousUser()
+    async def authenticate(self, scope):
+        params = parse_qs(scope.get("query_string", b"").decode())
 
-        if token:
-            token = token[0]
+        if params.get("ticket"):
+            user_id = await redeem_ticket(params["ticket"][0])
+            if user_id is None:
+                stats.record('invalid_ticket')
+                return AnonymousUser()
+            outcome = 'ticket'
+        elif params.get("token"):
             try:
-                payload = jwt_decode(token, settings.SECRET_KEY, algorithms=["HS256"])
-                user_id = payload.get("user_id")
-                
-                if user_id:
-                    user = await get_user(user_id)
-                    print(f"✅ WebSocket authenticated user: {user.id if not user.is_anonymous else 'Anonymous'}")
-                else:
-                    print("❌ No user_id in JWT payload")
-                    
-            except Exception as e:
-                print(f"❌ JWT Error: {e}")
-
-        self.scope["user"] = user
-        inner = self.inner(self.scope)
-        return await inner(receive, send)
\ No newline at end of file
+                # Same validation as the REST API: signature, expiry and token type
+                access_token = AccessToken(params["token"][0])
+            except TokenError:
+                stats.record('invalid_token')
+                return AnonymousUser()
+            user_id = access_token.get(api_settings.USER_ID_CLAIM)
+            outcome = 'token'
+        else:
+            stats.record('missing')
+            return AnonymousUser()
+
+        user = await get_user(user_id) if user_id is not None else None
+        if user is None:
+            stats.record('unknown_user')
+            return AnonymousUser()
+        stats.record(outcome)
+        return user
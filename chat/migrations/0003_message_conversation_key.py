@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:03
+
+from django.db import migrations, models
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat, Greatest, Least
+
+BACKFILL_BATCH_SIZE = 50000
+
+
+def backfill_conversation_key(apps, schema_editor):
+    # One set-based UPDATE per id range; each batch commits on its own
+    # (atomic = False), so a large table is never locked in one transaction
+    Message = apps.get_model('chat', 'Message')
+    key = Concat(
+        Cast(Least('sender_id', 'receiver_id'), CharField()),
+        Value('_'),
+        Cast(Greatest('sender_id', 'receiver_id'), CharField()),
+    )
+    last_id = Message.objects.aggregate(models.Max('id'))['id__max'] or 0
+    for start in range(0, last_id + 1, BACKFILL_BATCH_SIZE):
+        Message.objects.filter(
+            id__gte=start, id__lt=start + BACKFILL_BATCH_SIZE, conversation_key__isnull=True
+        ).update(conversation_key=key)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('chat', '0002_alter_message_options_rename_text_message_content_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='conversation_key',
+            field=models.CharField(editable=False, max_length=41, null=True),
+        ),
+        migrations.RunPython(backfill_conversation_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='message',
+            name='conversation_key',
+            field=models.CharField(editable=False, max_length=41),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation_key', 'timestamp', 'id'], name='chat_msg_conv_ts_idx'),
+        ),
+    ]
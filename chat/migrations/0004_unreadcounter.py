@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_unread_counters(apps, schema_editor):
+    # Start the counters from the messages that are unread today
+    Message = apps.get_model('chat', 'Message')
+    UnreadCounter = apps.get_model('chat', 'UnreadCounter')
+    rows = (
+        Message.objects.filter(read=False)
+        .values('receiver_id', 'conversation_key')
+        .annotate(unread=models.Count('id'))
+        .order_by()
+    )
+    UnreadCounter.objects.bulk_create(
+        (UnreadCounter(user_id=row['receiver_id'], conversation_key=row['conversation_key'], count=row['unread'])
+         for row in rows.iterator()),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0003_message_conversation_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('conversation_key', models.CharField(max_length=41)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'conversation_key'), name='chat_unread_user_conv_uniq')],
+            },
+        ),
+        migrations.RunPython(seed_unread_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_conversations(apps, schema_editor):
+    # One Conversation per existing conversation_key, pointing at its newest message
+    Message = apps.get_model('chat', 'Message')
+    Conversation = apps.get_model('chat', 'Conversation')
+    last_ids = (
+        Message.objects.values('conversation_key')
+        .annotate(last_id=models.Max('id'))
+        .order_by()
+        .values_list('last_id', flat=True)
+    )
+    last_ids = list(last_ids)
+    for start in range(0, len(last_ids), BACKFILL_BATCH_SIZE):
+        batch = Message.objects.filter(id__in=last_ids[start:start + BACKFILL_BATCH_SIZE])
+        Conversation.objects.bulk_create([
+            Conversation(
+                conversation_key=message.conversation_key,
+                user_low_id=min(message.sender_id, message.receiver_id),
+                user_high_id=max(message.sender_id, message.receiver_id),
+                last_message_id=message.id,
+                last_sender_id=message.sender_id,
+                last_message_preview=" ".join(message.content.split())[:120],
+                last_message_at=message.timestamp,
+            )
+            for message in batch
+        ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0004_unreadcounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Conversation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('conversation_key', models.CharField(max_length=41, unique=True)),
+                ('last_message_id', models.BigIntegerField(null=True)),
+                ('last_sender_id', models.BigIntegerField(null=True)),
+                ('last_message_preview', models.CharField(blank=True, max_length=120)),
+                ('last_message_at', models.DateTimeField(null=True)),
+                ('user_high', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user_low', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_low', '-last_message_at', '-id'], name='chat_conv_low_recent_idx'), models.Index(fields=['user_high', '-last_message_at', '-id'], name='chat_conv_high_recent_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:20
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def backfill_seq(apps, schema_editor):
+    # Number every conversation's messages 1, 2, 3, ... in (timestamp, id)
+    # order, in one pass over the (conversation_key, timestamp, id) index
+    Message = apps.get_model('chat', 'Message')
+    Conversation = apps.get_model('chat', 'Conversation')
+
+    batch = []
+    last_seq = {}
+    rows = Message.objects.order_by('conversation_key', 'timestamp', 'id').values_list('id', 'conversation_key')
+    for pk, key in rows.iterator(chunk_size=BACKFILL_BATCH_SIZE):
+        last_seq[key] = last_seq.get(key, 0) + 1
+        batch.append(Message(id=pk, seq=last_seq[key]))
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            Message.objects.bulk_update(batch, ['seq'])
+            batch = []
+    if batch:
+        Message.objects.bulk_update(batch, ['seq'])
+
+    for key, seq in last_seq.items():
+        Conversation.objects.filter(conversation_key=key).update(last_seq=seq)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0005_conversation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='message',
+            name='seq',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_seq, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='message',
+            name='seq',
+            field=models.PositiveBigIntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='message',
+            constraint=models.UniqueConstraint(fields=('conversation_key', 'seq'), name='chat_msg_conv_seq_uniq'),
+        ),
+    ]
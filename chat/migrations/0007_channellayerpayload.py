@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-17 04:35
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+
+def set_unlogged(apps, schema_editor):
+    # Short-lived rows: skip the WAL; Postgres only
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute('ALTER TABLE channels_layer_payload SET UNLOGGED')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chat', '0006_message_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelLayerPayload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), db_index=True)),
+                ('data', models.TextField()),
+            ],
+            options={
+                'db_table': 'channels_layer_payload',
+            },
+        ),
+        migrations.RunPython(set_unlogged, migrations.RunPython.noop),
+    ]
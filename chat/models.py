@@ -1,12 +1,147 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Now
 from django.conf import settings
 
+
+def conversation_key_for(user_a_id, user_b_id):
+    """Canonical key of the conversation between two users ("<min id>_<max id>")."""
+    return f"{min(user_a_id, user_b_id)}_{max(user_a_id, user_b_id)}"
+
+
 class Message(models.Model):
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="sent_messages")
     receiver = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="received_messages")
+    # Denormalized sender/receiver pair, so a conversation is one index range
+    conversation_key = models.CharField(max_length=41, editable=False)
+    # Gap-free position in the conversation (1, 2, 3, ...), see chat/conversations.py
+    seq = models.PositiveBigIntegerField(editable=False)
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # History pages: WHERE conversation_key = ? ORDER BY timestamp, id
+            models.Index(fields=['conversation_key', 'timestamp', 'id'], name='chat_msg_conv_ts_idx'),
+        ]
+        constraints = [
+            # Also the index for sync: WHERE conversation_key = ? AND seq > ?
+            models.UniqueConstraint(fields=['conversation_key', 'seq'], name='chat_msg_conv_seq_uniq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .conversations import assign_sequence, record_conversations
+        from .unread import record_new_messages, record_read
+
+        if not self.conversation_key:
+            self.conversation_key = conversation_key_for(self.sender_id, self.receiver_id)
+        if self.seq is None:
+            with transaction.atomic():
+                assign_sequence([self])
+                super().save(*args, **kwargs)
+                record_conversations([self])
+                record_new_messages([self])
+            return
+
+        update_fields = kwargs.get('update_fields')
+        if self.pk is None or (update_fields is not None and 'read' not in update_fields):
+            super().save(*args, **kwargs)
+            return
+        # Keep the receiver's unread counter in step when ``read`` changes
+        # (admin edits); bulk mark-read goes through unread.mark_read()
+        with transaction.atomic():
+            was_read = Message.objects.select_for_update().filter(pk=self.pk).values_list('read', flat=True).first()
+            super().save(*args, **kwargs)
+            if was_read is None or (was_read and not self.read):
+                record_new_messages([self])
+            elif self.read and not was_read:
+                record_read(self.receiver_id, self.conversation_key, 1)
+
+    def delete(self, *args, **kwargs):
+        from .unread import record_read
+
+        with transaction.atomic():
+            if not Message.objects.filter(pk=self.pk, read=True).exists():
+                record_read(self.receiver_id, self.conversation_key, 1)
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"{self.sender.email} -> {self.receiver.email}: {self.content[:20]}"
+
+
+class UnreadCounter(models.Model):
+    """
+    Unread messages of one user in one conversation, kept up to date when
+    messages are saved or read (see chat/unread.py) so the unread badge
+    never has to count Message rows.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="unread_counters")
+    conversation_key = models.CharField(max_length=41)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'conversation_key'], name='chat_unread_user_conv_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} in {self.conversation_key}: {self.count}"
+
+
+class Conversation(models.Model):
+    """
+    Read model of a conversation for the inbox: its two participants and
+    its latest message, updated whenever messages are saved (see
+    chat/conversations.py). Per-participant unread counts are the
+    UnreadCounter rows with the same conversation_key.
+    """
+    conversation_key = models.CharField(max_length=41, unique=True)
+    # Participant with the lower / higher id, as in the key
+    user_low = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    user_high = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    # seq of the newest message; the next message gets last_seq + 1
+    last_seq = models.PositiveBigIntegerField(default=0)
+    last_message_id = models.BigIntegerField(null=True)
+    last_sender_id = models.BigIntegerField(null=True)
+    last_message_preview = models.CharField(max_length=120, blank=True)
+    last_message_at = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [
+            # Inbox pages, newest activity first, for either participant
+            models.Index(fields=['user_low', '-last_message_at', '-id'], name='chat_conv_low_recent_idx'),
+            models.Index(fields=['user_high', '-last_message_at', '-id'], name='chat_conv_high_recent_idx'),
+        ]
+
+    def other_user(self, user_id):
+        return self.user_high if self.user_low_id == user_id else self.user_low
+
+    def __str__(self):
+        return self.conversation_key
+
+
+class ChannelLayerPayload(models.Model):
+    """
+    Channel layer messages too large for a Postgres NOTIFY: the
+    notification carries the row id instead (utils/channel_layers.py).
+    Rows live for seconds, so the table is unlogged on Postgres.
+    """
+    # Filled by Postgres: the layer inserts rows with raw SQL
+    created = models.DateTimeField(db_default=Now(), db_index=True)
+    data = models.TextField()
+
+    class Meta:
+        db_table = 'channels_layer_payload'
+
+
+class WebSocketTicket(models.Model):
+    """
+    Single-use WebSocket ticket (chat/tickets.py), for deployments without
+    a shared cache. Only the SHA-256 of the ticket is stored.
+    """
+    key = models.CharField(max_length=64, primary_key=True)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+")
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user_id} until {self.expires_at}"
@@ -0,0 +1,72 @@
+# chat/pagination.py - keyset pagination over (timestamp, id)
+import base64
+import binascii
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+
+def encode_cursor(message):
+    return encode_keyset(message.timestamp, message.pk)
+
+
+def encode_keyset(timestamp, pk):
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, pk = raw.rsplit("|", 1)
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None:
+            raise ValueError
+        return timestamp, int(pk)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValidationError({"detail": "Invalid cursor."})
+
+
+def get_page_size(value):
+    default = getattr(settings, 'CHAT_HISTORY_PAGE_SIZE', 50)
+    maximum = getattr(settings, 'CHAT_HISTORY_MAX_PAGE_SIZE', 200)
+    if value in (None, ''):
+        return default
+    try:
+        return max(1, min(int(value), maximum))
+    except (TypeError, ValueError):
+        raise ValidationError({"detail": "limit must be a number."})
+
+
+def paginate_messages(queryset, before=None, after=None, limit=None):
+    """
+    One page of messages in chronological order, found with an index range
+    on (timestamp, id) instead of OFFSET:
+
+        no cursor  the newest ``limit`` messages
+        before     the ``limit`` messages just older than the cursor
+        after      the ``limit`` messages just newer than the cursor
+
+    Returns (messages, has_more) where has_more says whether more messages
+    exist in the direction that was paged.
+    """
+    if before and after:
+        raise ValidationError({"detail": "Use either before or after, not both."})
+
+    if after:
+        timestamp, pk = decode_cursor(after)
+        queryset = queryset.filter(Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=pk))
+        page = list(queryset.order_by('timestamp', 'id')[:limit + 1])
+        return page[:limit], len(page) > limit
+
+    if before:
+        timestamp, pk = decode_cursor(before)
+        queryset = queryset.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=pk))
+    # Newest first so LIMIT takes the right end, then back to chronological order
+    page = list(queryset.order_by('-timestamp', '-id')[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    page.reverse()
+    return page, has_more
@@ -1,6 +1,11 @@
 from django.urls import re_path
-from .consumers import ChatConsumer
+from .consumers import LEGACY_SOCKETS, ChatConsumer, UserChatConsumer
 
 websocket_urlpatterns = [
-    re_path(r'ws/chat/(?P<user_id>\d+)/$', ChatConsumer.as_asgi()),
-]
\ No newline at end of file
+    # One socket for all of the user's conversations
+    re_path(r'ws/chat/$', UserChatConsumer.as_asgi()),
+]
+
+if LEGACY_SOCKETS:
+    # Legacy: one socket per conversation
+    websocket_urlpatterns.append(re_path(r'ws/chat/(?P<user_id>\d+)/$', ChatConsumer.as_asgi()))
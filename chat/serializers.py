@@ -1,10 +1,52 @@
 from rest_framework import serializers
-from .models import Message
+from .models import Conversation, Message
 
 class MessageSerializer(serializers.ModelSerializer):
-    sender = serializers.StringRelatedField()
-    receiver = serializers.StringRelatedField()
+    # Emails of the two participants come from the view's context
+    # ({user_id: email}), so a page of messages costs no user queries
+    sender = serializers.SerializerMethodField()
+    receiver = serializers.SerializerMethodField()
 
     class Meta:
         model = Message
-        fields = ['id', 'sender', 'receiver', 'content', 'timestamp', 'read']
+        fields = ['id', 'seq', 'sender', 'sender_id', 'receiver', 'receiver_id', 'content', 'timestamp', 'read']
+
+    def get_sender(self, obj):
+        return self._email(obj, 'sender')
+
+    def get_receiver(self, obj):
+        return self._email(obj, 'receiver')
+
+    def _email(self, obj, field):
+        emails = self.context.get('user_emails') or {}
+        user_id = getattr(obj, f'{field}_id')
+        if user_id in emails:
+            return emails[user_id]
+        return getattr(obj, field).email
+
+
+class ConversationSerializer(serializers.ModelSerializer):
+    # The view passes the requesting user's id and their unread counts
+    # ({conversation_key: unread}) in the context
+    user = serializers.SerializerMethodField()
+    last_message = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Conversation
+        fields = ['conversation_key', 'user', 'last_message', 'unread_count']
+
+    def get_user(self, obj):
+        other = obj.other_user(self.context['user_id'])
+        return {'id': other.id, 'email': other.email, 'name': other.name}
+
+    def get_last_message(self, obj):
+        return {
+            'id': obj.last_message_id,
+            'sender_id': obj.last_sender_id,
+            'preview': obj.last_message_preview,
+            'timestamp': obj.last_message_at,
+        }
+
+    def get_unread_count(self, obj):
+        return self.context.get('unread_counts', {}).get(obj.conversation_key, 0)
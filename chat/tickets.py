@@ -0,0 +1,63 @@
+# chat/tickets.py
+"""
+Single-use WebSocket tickets.
+
+A client that already holds a JWT asks api/v1/ws-ticket/ for a ticket and
+connects with ws/chat/?ticket=... within CHAT_WS_TICKET_TTL seconds.
+Tickets must be redeemable by any worker: they live in the cache when it
+is shared (Redis), otherwise in the database (WebSocketTicket). Either
+way they are deleted on first use.
+"""
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from utils.shared_cache import cache_is_shared
+
+from .models import WebSocketTicket
+
+# Seconds between issuing a ticket and opening the socket
+TICKET_TTL = getattr(settings, 'CHAT_WS_TICKET_TTL', 30)
+
+
+def _cache_key(ticket):
+    return f"chat:ws-ticket:{ticket}"
+
+
+def _digest(ticket):
+    return hashlib.sha256(ticket.encode()).hexdigest()
+
+
+def issue_ticket(user_id):
+    ticket = secrets.token_urlsafe(32)
+    if cache_is_shared():
+        cache.set(_cache_key(ticket), user_id, TICKET_TTL)
+        return ticket
+
+    now = timezone.now()
+    # Unused tickets are dropped as new ones are issued
+    WebSocketTicket.objects.filter(expires_at__lt=now).delete()
+    WebSocketTicket.objects.create(key=_digest(ticket), user_id=user_id, expires_at=now + timedelta(seconds=TICKET_TTL))
+    return ticket
+
+
+async def redeem_ticket(ticket):
+    """The ticket's user id, or None if it is unknown, expired or already used."""
+    if cache_is_shared():
+        key = _cache_key(ticket)
+        user_id = await cache.aget(key)
+        # Only the caller whose delete removed the key may use it
+        if user_id is None or not await cache.adelete(key):
+            return None
+        return user_id
+
+    tickets = WebSocketTicket.objects.filter(key=_digest(ticket), expires_at__gt=timezone.now())
+    user_id = await tickets.values_list('user_id', flat=True).afirst()
+    # Same rule in the database: the delete that removed the row wins
+    if user_id is None or not (await tickets.adelete())[0]:
+        return None
+    return user_id
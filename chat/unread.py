@@ -0,0 +1,165 @@
+# chat/unread.py
+"""
+Unread message counters.
+
+UnreadCounter holds one row per (user, conversation) with the number of
+messages the user has not read yet. Writers update it in the same
+transaction as the messages:
+
+    record_new_messages(messages)              after inserting messages
+    record_read(user_id, conversation_key, n)  after marking n messages read
+                                               (mark_read() does both)
+
+Message.save() and Message.delete() call them for single rows (admin,
+shell, scripts); bulk writers (chat/buffer.py, mark_read()) call them
+directly. Queryset update()/delete() bypass them and are left to
+reconciliation.
+
+Readers get the user's counts from the cache, falling back to the user's
+counter rows (one indexed query, independent of message volume). Without
+a shared cache (no REDIS_URL) they always read the rows: an invalidation
+could not reach the other workers' caches.
+reconcile_unread_counters() recounts from Message and fixes any drift; it
+runs nightly from the reconcile_unread_counters command
+(order/reset_cron_runner.py and the reconcile_unread_counters workflow).
+"""
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+
+from utils.shared_cache import cache_is_shared
+
+from .models import Message, UnreadCounter, conversation_key_for
+
+logger = logging.getLogger(__name__)
+
+# Seconds a user's counts stay cached; writes invalidate them right away
+UNREAD_CACHE_TTL = getattr(settings, 'CHAT_UNREAD_CACHE_TTL', 300)
+
+
+def _cache_key(user_id):
+    return f"chat:unread:{user_id}"
+
+
+def _invalidate(user_ids):
+    if not cache_is_shared():
+        return
+    keys = [_cache_key(user_id) for user_id in set(user_ids)]
+    # Only after commit, or a reader could cache the old counts again
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def record_new_messages(messages):
+    """Count saved, unread messages as unread for their receivers."""
+    added = Counter(
+        (message.receiver_id, message.conversation_key) for message in messages if message.pk and not message.read
+    )
+    if not added:
+        return
+
+    with transaction.atomic():
+        # Make sure every counter row exists, then add to all of them
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id, conversation_key=key) for user_id, key in added],
+            ignore_conflicts=True,
+        )
+        for (user_id, key), count in added.items():
+            UnreadCounter.objects.filter(user_id=user_id, conversation_key=key).update(count=F('count') + count)
+    _invalidate(user_id for user_id, _ in added)
+
+
+def record_read(user_id, conversation_key, count):
+    """Subtract ``count`` newly read messages from the user's counter."""
+    if count <= 0:
+        return
+    UnreadCounter.objects.filter(user_id=user_id, conversation_key=conversation_key).update(
+        count=Greatest(F('count') - count, 0)
+    )
+    _invalidate([user_id])
+
+
+def mark_read(user_id, other_user_id, timestamp, pk):
+    """
+    Mark everything the other user sent up to and including the message at
+    (timestamp, pk) as read by ``user_id``, with one UPDATE over the
+    conversation's index range. Returns the number of messages marked.
+    """
+    key = conversation_key_for(user_id, other_user_id)
+    with transaction.atomic():
+        marked = Message.objects.filter(
+            Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lte=pk),
+            conversation_key=key,
+            receiver_id=user_id,
+            read=False,
+        ).update(read=True)
+        record_read(user_id, key, marked)
+    return marked
+
+
+def get_unread_counts(user_id):
+    """{conversation_key: unread} for every conversation with unread messages."""
+    if not cache_is_shared():
+        # A per-process cache would keep serving counts another worker
+        # changed; the counter rows are one indexed query anyway
+        return _load_counts(user_id)
+    key = _cache_key(user_id)
+    counts = cache.get(key)
+    if counts is None:
+        counts = _load_counts(user_id)
+        cache.set(key, counts, UNREAD_CACHE_TTL)
+    return counts
+
+
+def _load_counts(user_id):
+    return dict(UnreadCounter.objects.filter(user_id=user_id, count__gt=0).values_list('conversation_key', 'count'))
+
+
+def get_unread_total(user_id):
+    return sum(get_unread_counts(user_id).values())
+
+
+def reconcile_unread_counters():
+    """
+    Recount unread messages from Message and correct the counters that
+    drifted. Returns the number of counters changed.
+    """
+    with transaction.atomic():
+        # Lock the counters first: message writes that commit meanwhile
+        # wait and apply their increments on top of the corrected values
+        stored = {
+            (counter.user_id, counter.conversation_key): counter
+            for counter in UnreadCounter.objects.select_for_update()
+        }
+        actual = {
+            (row['receiver_id'], row['conversation_key']): row['unread']
+            for row in Message.objects.filter(read=False)
+            .values('receiver_id', 'conversation_key')
+            .annotate(unread=Count('id'))
+            .order_by()
+        }
+
+        changed = []
+        for pair, counter in stored.items():
+            count = actual.pop(pair, 0)
+            if counter.count != count:
+                counter.count = count
+                changed.append(counter)
+        UnreadCounter.objects.bulk_update(changed, ['count'], batch_size=1000)
+
+        missing = [
+            UnreadCounter(user_id=user_id, conversation_key=key, count=count)
+            for (user_id, key), count in actual.items()
+        ]
+        UnreadCounter.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+
+        fixed = changed + missing
+        _invalidate(counter.user_id for counter in fixed)
+
+    if fixed:
+        logger.warning(f"[WARNING] Reconciled {len(fixed)} unread counters that had drifted")
+    return len(fixed)
@@ -1,36 +1,158 @@
+from asgiref.sync import async_to_sync
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.contrib.auth import get_user_model
-from .models import Message
-from .serializers import MessageSerializer
+from .consumers import read_receipt_event, send_to_participants
+from .conversations import get_inbox_page, messages_since
+from .models import Message, conversation_key_for
+from .pagination import decode_cursor, encode_cursor, encode_keyset, get_page_size, paginate_messages
+from .serializers import ConversationSerializer, MessageSerializer
+from .tickets import TICKET_TTL, issue_ticket
+from .unread import get_unread_counts, mark_read
 
 User = get_user_model()
 
 class MessageHistoryView(APIView):
+    """
+    Chat history with another user, one page at a time.
+
+    GET /api/v1/messages/<email>/?limit=50             newest page
+    GET /api/v1/messages/<email>/?before=<cursor>      older messages
+    GET /api/v1/messages/<email>/?after=<cursor>       newer messages
+    GET /api/v1/messages/<email>/?since_seq=41         messages after seq 41
+
+    Messages are in chronological order. ``before`` of the response pages
+    further back, ``after`` picks up anything newer than the page.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request, email):
         try:
-            other_user = User.objects.get(email=email)
+            other_user = User.objects.only('id', 'email').get(email=email)
         except User.DoesNotExist:
             return Response({"detail": "User not found."}, status=404)
 
-        # Fetch messages between logged-in user and this email
-        messages = Message.objects.filter(
-            sender__in=[request.user, other_user],
-            receiver__in=[request.user, other_user]
-        ).order_by("timestamp")
+        key = conversation_key_for(request.user.id, other_user.id)
+        limit = get_page_size(request.query_params.get('limit'))
+        user_emails = {request.user.id: request.user.email, other_user.id: other_user.email}
+
+        since_seq = request.query_params.get('since_seq')
+        if since_seq is not None:
+            # Gap filling after a WebSocket sync
+            try:
+                since_seq = max(0, int(since_seq))
+            except ValueError:
+                return Response({"detail": "since_seq must be a number."}, status=400)
+            page, has_more = messages_since(key, since_seq, limit)
+            serializer = MessageSerializer(page, many=True, context={'user_emails': user_emails})
+            return Response({
+                "results": serializer.data,
+                "last_seq": page[-1].seq if page else since_seq,
+                "has_more": has_more,
+            })
+
+        # Messages between logged-in user and this email: one range of
+        # the (conversation_key, timestamp, id) index
+        messages = Message.objects.filter(conversation_key=key)
+        before = request.query_params.get('before')
+        after = request.query_params.get('after')
+        page, has_more = paginate_messages(messages, before=before, after=after, limit=limit)
+
+        # Paging forward always leaves older messages behind the page
+        older_exists = True if after else has_more
+
+        serializer = MessageSerializer(page, many=True, context={'user_emails': user_emails})
+        return Response({
+            "results": serializer.data,
+            # Older messages exist before this page
+            "before": encode_cursor(page[0]) if page and older_exists else None,
+            # Cursor for polling newer messages
+            "after": encode_cursor(page[-1]) if page else after,
+            "has_more": has_more,
+        })
+
+
+class ConversationListView(APIView):
+    """
+    The logged-in user's conversations, most recent activity first.
+
+    GET /api/v1/conversations/?limit=50
+    GET /api/v1/conversations/?before=<cursor>   the next page
+
+    Each conversation has the other user, a preview of the last message and
+    the user's unread count. A page costs the same few queries however many
+    conversations or messages exist.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        limit = get_page_size(request.query_params.get('limit'))
+        page, has_more = get_inbox_page(request.user.id, before=request.query_params.get('before'), limit=limit)
+
+        serializer = ConversationSerializer(page, many=True, context={
+            'user_id': request.user.id,
+            'unread_counts': get_unread_counts(request.user.id),
+        })
+        return Response({
+            "results": serializer.data,
+            "before": encode_keyset(page[-1].last_message_at, page[-1].id) if page and has_more else None,
+            "has_more": has_more,
+        })
+
+
+class MarkReadView(APIView):
+    """
+    Mark the messages another user sent, up to a cursor, as read.
+
+    POST /api/v1/messages/<email>/read/   {"up_to": <cursor>}
+
+    ``up_to`` is a cursor from the history endpoint (usually its ``after``),
+    so a client marks everything it has shown. Both users' sockets get one
+    read receipt.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, email):
+        try:
+            other_user = User.objects.only('id').get(email=email)
+        except User.DoesNotExist:
+            return Response({"detail": "User not found."}, status=404)
+
+        up_to = request.data.get('up_to')
+        if not up_to:
+            return Response({"detail": "up_to is required."}, status=400)
+        timestamp, pk = decode_cursor(str(up_to))
+
+        marked = mark_read(request.user.id, other_user.id, timestamp, pk)
+        if marked:
+            key = conversation_key_for(request.user.id, other_user.id)
+            async_to_sync(send_to_participants)(key, read_receipt_event(request.user.id, key, up_to, marked))
+        return Response({"marked": marked})
+
+
+class WebSocketTicketView(APIView):
+    """
+    POST /api/v1/ws-ticket/ -> {"ticket": ..., "expires_in": seconds}
+
+    Connect with ws/chat/?ticket=<ticket>. A ticket works once, so it
+    is safe in a URL, unlike the JWT itself.
+    """
+    permission_classes = [IsAuthenticated]
 
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+    def post(self, request):
+        return Response({"ticket": issue_ticket(request.user.id), "expires_in": TICKET_TTL})
 
 
 class UnreadCountView(APIView):
+    """
+    Unread messages of the logged-in user, in total and per conversation
+    key. Served from the unread counters (chat/unread.py), so the cost does
+    not grow with the number of messages.
+    """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        user = request.user
-        count = Message.objects.filter(receiver=user, read=False).count()
-        return Response({'unread_count': count})
+        counts = get_unread_counts(request.user.id)
+        return Response({'unread_count': sum(counts.values()), 'conversations': counts})
 
@@ -0,0 +1,51 @@
+"""
+ASGI lifespan handler for framestack.
+
+uvicorn sends lifespan.startup once the worker's event loop is running and
+lifespan.shutdown before the worker exits (deploys, restarts, scaling
+down). Per-process state that lives on the event loop is opened and
+flushed here, while the loop is running.
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _on_startup():
+    from utils.brevo_email_async import async_brevo_email_sender
+
+    # One pooled Brevo session for the async sends of this worker
+    await async_brevo_email_sender.open()
+
+
+async def _on_shutdown():
+    from chat.buffer import message_buffer
+    from utils.brevo_email_async import async_brevo_email_sender
+
+    # Buffered chat messages must reach the database
+    await message_buffer.close()
+    # Let fire-and-forget async emails finish
+    await async_brevo_email_sender.aclose()
+
+
+async def lifespan_app(scope, receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await _on_startup()
+            except Exception as e:
+                logger.error(f"[ERROR] Startup hook failed: {str(e)}")
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            try:
+                await _on_shutdown()
+            except Exception as e:
+                logger.error(f"[ERROR] Shutdown hook failed: {str(e)}")
+                await send({'type': 'lifespan.shutdown.failed', 'message': str(e)})
+            else:
+                await send({'type': 'lifespan.shutdown.complete'})
+            return
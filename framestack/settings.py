@@ -64,6 +64,7 @@ INSTALLED_APPS = [
     'chat',
     'message',
     'django_crontab',
+    'mailer',
 
 ]
 
@@ -183,6 +184,7 @@ from pathlib import Path
 
 # Email Configuration
 BREVO_API_KEY = os.getenv('BREVO_API_KEY')  # Your Brevo API key
+BREVO_API_HOST = os.getenv('BREVO_API_HOST', 'https://api.brevo.com/v3')
 
 # Sender email (must be verified in Brevo)
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'tejavitap@gmail.com')
@@ -194,6 +196,80 @@ FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://framestack.onrender.com')
 # Optional: Enable/disable login notifications
 SEND_LOGIN_NOTIFICATIONS = os.getenv('SEND_LOGIN_NOTIFICATIONS', 'False') == 'True'
 
+# Outbound email worker pool (utils/email_executor.py)
+EMAIL_WORKER_THREADS = int(os.getenv('EMAIL_WORKER_THREADS', '4'))
+EMAIL_QUEUE_MAXSIZE = int(os.getenv('EMAIL_QUEUE_MAXSIZE', '500'))
+# When the queue is full: 'block' (wait EMAIL_QUEUE_BLOCK_TIMEOUT seconds, then drop),
+# 'drop' or 'caller_runs' (send synchronously in the request thread)
+EMAIL_QUEUE_OVERFLOW = os.getenv('EMAIL_QUEUE_OVERFLOW', 'block')
+EMAIL_QUEUE_BLOCK_TIMEOUT = float(os.getenv('EMAIL_QUEUE_BLOCK_TIMEOUT', '2'))
+# Seconds a stopping worker process waits for queued emails to be sent
+EMAIL_SHUTDOWN_TIMEOUT = float(os.getenv('EMAIL_SHUTDOWN_TIMEOUT', '10'))
+# Kept-alive HTTPS connections to Brevo per process (defaults to EMAIL_WORKER_THREADS + 1)
+BREVO_CONNECTION_POOL_SIZE = int(os.getenv('BREVO_CONNECTION_POOL_SIZE', str(EMAIL_WORKER_THREADS + 1)))
+
+# Retries for 429/5xx Brevo responses before an email goes to the dead-letter store
+EMAIL_MAX_RETRIES = int(os.getenv('EMAIL_MAX_RETRIES', '3'))
+EMAIL_RETRY_BASE_DELAY = float(os.getenv('EMAIL_RETRY_BASE_DELAY', '1'))
+EMAIL_RETRY_MAX_DELAY = float(os.getenv('EMAIL_RETRY_MAX_DELAY', '30'))
+
+# Recipients per Brevo batch request for bulk sends (Brevo's limit is 1000)
+EMAIL_BULK_CHUNK_SIZE = int(os.getenv('EMAIL_BULK_CHUNK_SIZE', '1000'))
+
+# asyncio sender (utils/brevo_email_async.py): concurrent Brevo requests per
+# worker and the total timeout of one request in seconds
+EMAIL_ASYNC_CONCURRENCY = int(os.getenv('EMAIL_ASYNC_CONCURRENCY', '10'))
+EMAIL_ASYNC_TIMEOUT = float(os.getenv('EMAIL_ASYNC_TIMEOUT', '30'))
+
+# Email throttle (utils/email_throttle.py), kept in the shared cache below.
+# Seconds before the same template may go to the same address again:
+EMAIL_THROTTLE_COOLDOWNS = {
+    'password_reset': int(os.getenv('EMAIL_COOLDOWN_PASSWORD_RESET', '120')),
+    'login_notification': int(os.getenv('EMAIL_COOLDOWN_LOGIN_NOTIFICATION', '600')),
+}
+# At most EMAIL_GLOBAL_RATE_LIMIT emails in any EMAIL_GLOBAL_RATE_WINDOW seconds across all workers (0 = off).
+# Mail over the limit waits for room for up to EMAIL_THROTTLE_MAX_DEFER seconds, then goes to the dead-letter store
+EMAIL_GLOBAL_RATE_LIMIT = int(os.getenv('EMAIL_GLOBAL_RATE_LIMIT', '300'))
+EMAIL_GLOBAL_RATE_WINDOW = int(os.getenv('EMAIL_GLOBAL_RATE_WINDOW', '60'))
+EMAIL_THROTTLE_MAX_DEFER = int(os.getenv('EMAIL_THROTTLE_MAX_DEFER', '300'))
+# Identical messages are collapsed while one is pending (at most this many seconds)
+EMAIL_DEDUPE_TTL = int(os.getenv('EMAIL_DEDUPE_TTL', '300'))
+EMAIL_THROTTLE_CACHE = 'default'
+
+# Brevo webhook (api/v1/webhooks/brevo/) feeding the bounce/complaint suppression list
+BREVO_WEBHOOK_SECRET = os.getenv('BREVO_WEBHOOK_SECRET')
+# Per-process cache of suppression lookups: entries and seconds before a webhook
+# handled by another worker is seen here
+EMAIL_SUPPRESSION_CACHE_SIZE = int(os.getenv('EMAIL_SUPPRESSION_CACHE_SIZE', '10000'))
+EMAIL_SUPPRESSION_CACHE_TTL = int(os.getenv('EMAIL_SUPPRESSION_CACHE_TTL', '300'))
+
+# Shared cache: Redis when REDIS_URL is set, otherwise per-process memory
+# (limits then only apply within one worker)
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Contact form admin notifications: one digest email every
+# CONTACT_DIGEST_INTERVAL minutes (order/reset_cron_runner.py and the
+# contact_digest workflow), or on the next submission once CONTACT_DIGEST_BATCH_SIZE
+# messages are pending (0 = no size limit) or the oldest has waited the interval.
+# Disable for one email per message.
+CONTACT_DIGEST_ENABLED = os.getenv('CONTACT_DIGEST_ENABLED', 'True') == 'True'
+CONTACT_DIGEST_INTERVAL = int(os.getenv('CONTACT_DIGEST_INTERVAL', '15'))
+CONTACT_DIGEST_BATCH_SIZE = int(os.getenv('CONTACT_DIGEST_BATCH_SIZE', '20'))
+CONTACT_DIGEST_MAX_ITEMS = int(os.getenv('CONTACT_DIGEST_MAX_ITEMS', '50'))
+
 # Razorpay Configuration
 RAZORPAY_KEY_ID = os.getenv('RAZORPAY_KEY_ID')
 RAZORPAY_KEY_SECRET = os.getenv('RAZORPAY_KEY_SECRET')
@@ -223,6 +299,16 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'utils.brevo_email_async': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'utils.email_executor': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
         'user.views': {
             'handlers': ['console'],
             'level': 'INFO',
@@ -275,13 +361,68 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 ASGI_APPLICATION = 'framestack.asgi.application'
 
-CHANNEL_LAYERS = {
-'default': {
+# Shared between all ASGI workers (see gunicorn.conf.py). CHANNEL_LAYER_BACKEND:
+#   redis     channels_redis on REDIS_URL (the default)
+#   postgres  LISTEN/NOTIFY on the default database, no Redis needed; holds
+#             1 + CHANNEL_LAYER_PG_SEND_CONNECTIONS connections per worker
+#   local     in-process only; requires WEB_CONCURRENCY=1
+# bench_channel_layer compares them for latency and throughput.
+CHANNEL_LAYER_BACKEND = os.getenv('CHANNEL_LAYER_BACKEND', 'redis')
+CHANNEL_LAYER_PG_SEND_CONNECTIONS = int(os.getenv('CHANNEL_LAYER_PG_SEND_CONNECTIONS', '2'))
+CHANNEL_LAYER_CONFIGS = {
+'redis': {
 'BACKEND': 'channels_redis.core.RedisChannelLayer',
-'CONFIG': { 'hosts': [('127.0.0.1', 6379)], },
+'CONFIG': { 'hosts': [REDIS_URL or ('127.0.0.1', 6379)], },
+},
+'postgres': {
+'BACKEND': 'utils.channel_layers.PostgresChannelLayer',
+'CONFIG': { 'database': 'default', 'send_connections': CHANNEL_LAYER_PG_SEND_CONNECTIONS, },
 },
+'local': {
+'BACKEND': 'utils.channel_layers.LocalChannelLayer',
+},
+}
+CHANNEL_LAYERS = {
+'default': CHANNEL_LAYER_CONFIGS[CHANNEL_LAYER_BACKEND],
 }
 
+# Chat messages are inserted in batches (chat/buffer.py): at most this many
+# per bulk_create, and at most this many seconds after the first one arrives
+CHAT_WRITE_BUFFER_SIZE = int(os.getenv('CHAT_WRITE_BUFFER_SIZE', '100'))
+CHAT_WRITE_BUFFER_DELAY = float(os.getenv('CHAT_WRITE_BUFFER_DELAY', '0.02'))
+# Chat history pages (api/v1/messages/<email>/?limit=)
+CHAT_HISTORY_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_PAGE_SIZE', '50'))
+CHAT_HISTORY_MAX_PAGE_SIZE = int(os.getenv('CHAT_HISTORY_MAX_PAGE_SIZE', '200'))
+# Seconds a client_id is remembered to drop resent chat messages
+CHAT_CLIENT_ID_TTL = int(os.getenv('CHAT_CLIENT_ID_TTL', '600'))
+# Most missed messages a WebSocket sync (since_seq) replays at once
+CHAT_SYNC_MAX_MESSAGES = int(os.getenv('CHAT_SYNC_MAX_MESSAGES', '500'))
+# Serve the legacy per-conversation sockets (ws/chat/<user_id>/); turn off
+# once all clients use ws/chat/ to save one group_send per chat event
+CHAT_LEGACY_SOCKETS = os.getenv('CHAT_LEGACY_SOCKETS', 'True') == 'True'
+# WebSocket limits (chat/limits.py): frame size (larger frames close the
+# socket), frames per second per connection (with burst) and per user
+# across workers, rejections in a row before closing, and chat messages a
+# worker may have waiting for the database before it answers "busy"
+CHAT_MAX_FRAME_SIZE = int(os.getenv('CHAT_MAX_FRAME_SIZE', '16384'))
+CHAT_CONNECTION_RATE = float(os.getenv('CHAT_CONNECTION_RATE', '10'))
+CHAT_CONNECTION_BURST = int(os.getenv('CHAT_CONNECTION_BURST', '20'))
+CHAT_USER_RATE = int(os.getenv('CHAT_USER_RATE', '30'))
+CHAT_RATE_LIMIT_STRIKES = int(os.getenv('CHAT_RATE_LIMIT_STRIKES', '20'))
+CHAT_MAX_PENDING_WRITES = int(os.getenv('CHAT_MAX_PENDING_WRITES', '2000'))
+# Application-level WebSocket ping interval, and silence (seconds) after
+# which a chat socket is closed and leaves its channel layer group
+CHAT_HEARTBEAT_INTERVAL = float(os.getenv('CHAT_HEARTBEAT_INTERVAL', '25'))
+CHAT_HEARTBEAT_TIMEOUT = float(os.getenv('CHAT_HEARTBEAT_TIMEOUT', '60'))
+# Seconds a user's unread counts stay cached (writes invalidate them); only
+# with a shared cache (REDIS_URL), otherwise they are read from the counters
+CHAT_UNREAD_CACHE_TTL = int(os.getenv('CHAT_UNREAD_CACHE_TTL', '300'))
+# Seconds a WebSocket ticket (api/v1/ws-ticket/) stays valid
+CHAT_WS_TICKET_TTL = int(os.getenv('CHAT_WS_TICKET_TTL', '30'))
+# Per-process cache of active users for WebSocket auth
+CHAT_WS_USER_CACHE_SIZE = int(os.getenv('CHAT_WS_USER_CACHE_SIZE', '10000'))
+CHAT_WS_USER_CACHE_TTL = int(os.getenv('CHAT_WS_USER_CACHE_TTL', '60'))
+
 
 
 CRONJOBS = [
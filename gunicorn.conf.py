@@ -0,0 +1,59 @@
+# gunicorn.conf.py - production process profile (used by the Procfile)
+#
+# One deployment serves the REST API and the chat WebSockets from
+# framestack.asgi:application. Gunicorn only manages processes; every worker
+# is a uvicorn event loop that handles both protocols.
+#
+# Sizing model, per worker process:
+#   - WebSockets: one event loop holds all of the worker's open sockets.
+#     Idle sockets are cheap, so sockets per worker are bounded by memory,
+#     not threads.
+#   - HTTP: Django runs sync views in a thread per in-flight request, so a
+#     worker uses (concurrent requests) threads and DB connections.
+#   - Consumer DB calls (database_sync_to_async) share one thread per
+#     worker. Scale chat write throughput with more workers, not threads.
+#   - Email: EMAIL_WORKER_THREADS background threads (utils/email_executor.py)
+#     and as many kept-alive Brevo connections.
+#   - CHANNEL_LAYER_BACKEND=postgres: the channel layer keeps its own
+#     connections open, 1 LISTEN connection plus
+#     CHANNEL_LAYER_PG_SEND_CONNECTIONS (default 2) senders.
+#
+# Totals for the deployment:
+#   processes            = WEB_CONCURRENCY
+#   Brevo concurrency    = WEB_CONCURRENCY * EMAIL_WORKER_THREADS
+#   Postgres connections ~ WEB_CONCURRENCY * (peak concurrent requests per
+#                          worker + 1 consumer thread + EMAIL_WORKER_THREADS
+#                          + 1 + CHANNEL_LAYER_PG_SEND_CONNECTIONS with the
+#                          postgres channel layer)
+#                          and must stay below max_connections
+#
+# Workers default to 2: each one is a full Django process with its own
+# Channels state, email workers and DB connections, which small instances
+# feel first. Where memory and max_connections allow, raise WEB_CONCURRENCY
+# towards 2 * CPU cores + 1. With more than one worker,
+# chat messages cross processes through the channel layer, so it must be
+# shared: CHANNEL_LAYER_BACKEND=redis (REDIS_URL) or postgres. The local
+# backend keeps messages inside one process and forces a single worker.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# uvicorn.workers is deprecated; the worker now ships as uvicorn-worker
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+if os.getenv("CHANNEL_LAYER_BACKEND") == "local":
+    workers = 1
+
+# Seconds a worker may block its event loop before it is restarted
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+# On deploys/restarts: time for open requests to finish and for the email
+# queue to drain (EMAIL_SHUTDOWN_TIMEOUT) before the worker is killed
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+# HTTP keep-alive behind Render's proxy
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# No max_requests: recycling a worker would drop every WebSocket it holds
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+forwarded_allow_ips = "*"
@@ -0,0 +1,33 @@
+from django.contrib import admin
+from .models import EmailSuppression, FailedEmail
+from utils.email_suppression import suppression_list
+
+@admin.register(FailedEmail)
+class FailedEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status_code', 'attempts', 'created_at', 'replayed_at')
+    list_filter = ('status_code', 'replayed_at')
+    search_fields = ('subject', 'error')
+
+
+@admin.register(EmailSuppression)
+class EmailSuppressionAdmin(admin.ModelAdmin):
+    list_display = ('email', 'reason', 'event_at', 'updated_at')
+    list_filter = ('reason',)
+    search_fields = ('email',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        reasons = {obj.email: obj.reason}
+        previous = form.initial.get('email')
+        if change and previous and previous != obj.email:
+            reasons[previous] = None
+        suppression_list.mark(reasons)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        suppression_list.mark({obj.email: None})
+
+    def delete_queryset(self, request, queryset):
+        emails = list(queryset.values_list('email', flat=True))
+        super().delete_queryset(request, queryset)
+        suppression_list.mark(dict.fromkeys(emails))
@@ -0,0 +1,144 @@
+# mailer/brevo_standin.py
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class BrevoStandInStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.recipients = 0
+        self.by_status = {}
+
+    def record(self, status, recipients):
+        with self._lock:
+            self.requests += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+            if status < 400:
+                self.recipients += recipients
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "delivered_recipients": self.recipients,
+                "by_status": dict(sorted(self.by_status.items())),
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, like the real API, so the client's connection pool is exercised
+    protocol_version = "HTTP/1.1"
+    server_version = "BrevoStandIn/1.0"
+    # Headers and body are written separately; without TCP_NODELAY every
+    # response would wait for the client's delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        server = self.server
+
+        if not self.path.rstrip("/").endswith("/smtp/email"):
+            return self._reply(404, {"code": "not_found", "message": "Invalid route"})
+
+        if server.api_key is not None and self.headers.get("api-key") != server.api_key:
+            return self._reply(401, {"code": "unauthorized", "message": "Key not found"})
+
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return self._reply(400, {"code": "bad_request", "message": "Invalid JSON"})
+
+        versions = payload.get("messageVersions") or []
+        recipients = sum(len(version.get("to") or []) for version in versions) or len(payload.get("to") or [])
+        if not payload.get("sender") or not recipients:
+            return self._reply(400, {"code": "missing_parameter", "message": "sender and to are required"})
+
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < server.throttle_rate:
+            return self._reply(
+                429,
+                {"code": "too_many_requests", "message": "Rate limit exceeded"},
+                recipients,
+                headers={
+                    "x-sib-ratelimit-limit": "1000",
+                    "x-sib-ratelimit-remaining": "0",
+                    "x-sib-ratelimit-reset": str(server.retry_after),
+                },
+            )
+        if roll < server.throttle_rate + server.error_rate:
+            return self._reply(500, {"code": "internal_error", "message": "Internal server error"}, recipients)
+
+        if versions:
+            response = {"messageIds": [f"<{uuid.uuid4().hex}@standin>" for _ in versions]}
+        else:
+            response = {"messageId": f"<{uuid.uuid4().hex}@standin>"}
+        self._reply(201, response, recipients)
+
+    def _reply(self, status, data, recipients=0, headers=None):
+        self.server.stats.record(status, recipients)
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class BrevoStandIn(ThreadingHTTPServer):
+    """
+    Local imitation of Brevo's POST /v3/smtp/email endpoint for load tests.
+
+    Every request sleeps ``latency`` seconds plus up to ``jitter`` seconds,
+    then answers 429 (with x-sib-ratelimit-reset) with probability
+    ``throttle_rate``, 500 with probability ``error_rate`` and 201 with a
+    message id otherwise. Point BREVO_API_HOST at ``url``.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.05, jitter=0.0, error_rate=0.0,
+                 throttle_rate=0.0, retry_after=1, api_key=None, verbose=False):
+        if error_rate + throttle_rate > 1:
+            raise ValueError("error_rate + throttle_rate must not exceed 1")
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.api_key = api_key
+        self.verbose = verbose
+        self.stats = BrevoStandInStats()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v3"
+
+    def start(self):
+        """Serve from a daemon thread (for in-process benchmarks)."""
+        self._thread = threading.Thread(target=self.serve_forever, name="brevo-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
@@ -0,0 +1,226 @@
+# management/commands/bench_email_pipeline.py
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from mailer.brevo_standin import BrevoStandIn
+from utils.brevo_email import brevo_email_sender, send_email_async_api
+from utils.email_executor import email_queue_stats, shutdown_email_executor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _app_threads():
+    # Leave out the benchmark's sampler and the in-process stand-in's threads
+    return sum(
+        1 for thread in threading.enumerate()
+        if not thread.name.startswith(("brevo-standin", "bench-"))
+        and "process_request_thread" not in thread.name
+    )
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive send_email_async_api at a fixed rate against a Brevo stand-in and report "
+        "throughput, enqueue-to-delivery latency, peak thread count and memory. "
+        "Failed sends go to the dead-letter table as they would in production. The global "
+        "send rate limit is off while benchmarking unless --keep-rate-limit is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rate', type=float, default=50, help="Emails submitted per second")
+        parser.add_argument('--count', type=int, default=500, help="Emails to send")
+        parser.add_argument('--api-host', help="Use an already running stand-in (e.g. http://127.0.0.1:8025/v3)")
+        parser.add_argument('--latency-ms', type=float, default=50, help="In-process stand-in: delay per request")
+        parser.add_argument('--jitter-ms', type=float, default=0, help="In-process stand-in: extra random delay")
+        parser.add_argument('--error-rate', type=float, default=0, help="In-process stand-in: fraction of 500s")
+        parser.add_argument('--throttle-rate', type=float, default=0, help="In-process stand-in: fraction of 429s")
+        parser.add_argument('--timeout', type=float, default=120, help="Seconds to wait for the queue to drain")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+        parser.add_argument('--baseline', help="Compare against a JSON file written by --output")
+        parser.add_argument('--keep-rate-limit', action='store_true',
+                            help="Leave EMAIL_GLOBAL_RATE_LIMIT on; sends over it are deferred, not dropped")
+        parser.add_argument('--verbose', action='store_true', help="Keep the per-email log lines")
+
+    def handle(self, *args, **options):
+        if options['rate'] <= 0 or options['count'] <= 0:
+            raise CommandError("--rate and --count must be positive.")
+
+        if not options['verbose']:
+            logging.getLogger('utils.brevo_email').setLevel(logging.WARNING)
+
+        standin = None
+        if options['api_host']:
+            settings.BREVO_API_HOST = options['api_host']
+        else:
+            standin = BrevoStandIn(
+                latency=options['latency_ms'] / 1000,
+                jitter=options['jitter_ms'] / 1000,
+                error_rate=options['error_rate'],
+                throttle_rate=options['throttle_rate'],
+            ).start()
+            settings.BREVO_API_HOST = standin.url
+        # The client reads BREVO_API_HOST when it is built
+        brevo_email_sender._api_instance = None
+        # Otherwise the throttle, not the pipeline, sets the measured throughput
+        rate_limit = getattr(settings, 'EMAIL_GLOBAL_RATE_LIMIT', 0)
+        if not options['keep_rate_limit']:
+            settings.EMAIL_GLOBAL_RATE_LIMIT = 0
+
+        try:
+            results = self._run(options['rate'], options['count'], options['timeout'])
+        finally:
+            settings.EMAIL_GLOBAL_RATE_LIMIT = rate_limit
+            if standin is not None:
+                standin.stop()
+
+        if standin is not None:
+            results['standin'] = standin.stats.snapshot()
+        self._report(results)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as f:
+                self._compare(json.load(f), results)
+
+    def _run(self, rate, count, timeout):
+        latencies = []
+        outcomes = {"delivered": 0, "failed": 0, "not_queued": 0}
+        lock = threading.Lock()
+        done = threading.Semaphore(0)
+
+        def _on_done(future, enqueued_at):
+            finished_at = time.monotonic()
+            ok = not future.cancelled() and future.exception() is None and future.result()
+            with lock:
+                latencies.append(finished_at - enqueued_at)
+                outcomes["delivered" if ok else "failed"] += 1
+            done.release()
+
+        # Sample the thread count while the benchmark runs
+        peak_threads = _app_threads()
+        sampling = threading.Event()
+
+        def _sample():
+            nonlocal peak_threads
+            while not sampling.wait(0.01):
+                peak_threads = max(peak_threads, _app_threads())
+
+        sampler = threading.Thread(target=_sample, name="bench-sampler", daemon=True)
+        sampler.start()
+        baseline_threads = _app_threads()
+        rss_before = _max_rss_mb()
+
+        started_at = time.monotonic()
+        interval = 1 / rate
+        submitted = 0
+        for i in range(count):
+            # Open-loop schedule: submit at the target time even if earlier sends are slow
+            delay = started_at + i * interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            enqueued_at = time.monotonic()
+            future = send_email_async_api(
+                subject=f"Benchmark {i}",
+                message="Email pipeline benchmark",
+                recipient_list=[f"bench{i}@example.com"],
+                html_message="<p>Email pipeline benchmark</p>",
+            )
+            if future is None:
+                # Suppressed, deduplicated or the queue was full; rate-limited sends come back as deferred futures
+                outcomes["not_queued"] += 1
+                continue
+            submitted += 1
+            future.add_done_callback(lambda f, t=enqueued_at: _on_done(f, t))
+        submit_seconds = time.monotonic() - started_at
+
+        deadline = time.monotonic() + timeout
+        waited = 0
+        while waited < submitted and done.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            waited += 1
+        elapsed = time.monotonic() - started_at
+
+        sampling.set()
+        sampler.join()
+        queue_stats = email_queue_stats()
+        shutdown_email_executor(drain=False, timeout=1)
+
+        with lock:
+            finished = list(latencies)
+            outcomes = dict(outcomes)
+
+        return {
+            "target_rate": rate,
+            "count": count,
+            "submit_rate": count / submit_seconds if submit_seconds else 0.0,
+            "throughput": outcomes["delivered"] / elapsed if elapsed else 0.0,
+            "elapsed": elapsed,
+            "timed_out": submitted - waited,
+            **outcomes,
+            "latency_p50_ms": _percentile(finished, 0.50) * 1000,
+            "latency_p99_ms": _percentile(finished, 0.99) * 1000,
+            "latency_max_ms": max(finished, default=0.0) * 1000,
+            "threads_before": baseline_threads,
+            "threads_peak": peak_threads,
+            "max_rss_mb_before": rss_before,
+            "max_rss_mb_after": _max_rss_mb(),
+            "peak_queue_depth": queue_stats.get("peak_queue_depth", 0),
+            "caller_runs": queue_stats.get("caller_runs", 0),
+        }
+
+    def _report(self, results):
+        self.stdout.write(
+            f"Sent {results['count']} emails at {results['target_rate']:.0f}/s target "
+            f"({results['submit_rate']:.1f}/s achieved) in {results['elapsed']:.2f}s"
+        )
+        self.stdout.write(
+            f"  delivered {results['delivered']}, failed {results['failed']}, "
+            f"not queued {results['not_queued']}, still pending {results['timed_out']}"
+        )
+        self.stdout.write(f"  throughput      {results['throughput']:.1f} emails/s")
+        self.stdout.write(
+            f"  latency         p50 {results['latency_p50_ms']:.1f} ms, p99 {results['latency_p99_ms']:.1f} ms, "
+            f"max {results['latency_max_ms']:.1f} ms"
+        )
+        self.stdout.write(f"  threads         {results['threads_before']} before, {results['threads_peak']} peak")
+        self.stdout.write(f"  peak queue      {results['peak_queue_depth']} (caller runs {results['caller_runs']})")
+        if results['max_rss_mb_after'] is not None:
+            self.stdout.write(
+                f"  max RSS         {results['max_rss_mb_before']:.1f} MB before, "
+                f"{results['max_rss_mb_after']:.1f} MB after"
+            )
+        if 'standin' in results:
+            self.stdout.write(f"  stand-in        {results['standin']}")
+
+    def _compare(self, baseline, results):
+        self.stdout.write("Compared with baseline:")
+        for key in ('throughput', 'latency_p50_ms', 'latency_p99_ms', 'threads_peak', 'max_rss_mb_after'):
+            old, new = baseline.get(key), results.get(key)
+            if old is None or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            self.stdout.write(f"  {key:<17} {old:>10.1f} -> {new:>10.1f} ({change})")
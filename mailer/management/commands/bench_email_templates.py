@@ -0,0 +1,147 @@
+# management/commands/bench_email_templates.py
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from utils.email_templates import render_email
+
+
+# The inline f-string layouts the views used before the template registry,
+# kept here as the benchmark baseline.
+def legacy_welcome(name):
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px 10px 0 0; text-align: center; }}
+            .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
+            .button {{ display: inline-block; padding: 12px 30px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; margin-top: 20px; }}
+            .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🎉 Welcome to FrameStack!</h1>
+            </div>
+            <div class="content">
+                <h2>Hello {name}!</h2>
+                <p>Thank you for creating an account with FrameStack. We're thrilled to have you as part of our community!</p>
+                
+                <h3>Here's what you can do next:</h3>
+                <ul>
+                    <li>✨ Complete your profile</li>
+                    <li>🚀 Explore our features</li>
+                    <li>💎 Choose a plan that suits your needs</li>
+                </ul>
+                
+                <center>
+                    <a href="https://framestack.onrender.com/dashboard" class="button">Go to Dashboard</a>
+                </center>
+                
+                <p style="margin-top: 30px;">If you have any questions, our support team is here to help!</p>
+            </div>
+            <div class="footer">
+                <p>© 2024 FrameStack. All rights reserved.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+def legacy_password_reset(name, reset_link):
+    return f"""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background: #f9f9f9; }}
+            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px; }}
+            .content {{ background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
+            .button {{ display: inline-block; padding: 15px 40px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; text-decoration: none; border-radius: 5px; font-weight: bold; margin: 20px 0; }}
+            .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
+            .warning {{ background: #fff3cd; border-left: 4px solid #ffc107; padding: 10px; margin: 20px 0; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🔒 Password Reset Request</h1>
+            </div>
+            
+            <div class="content">
+                <h2>Hello {name}!</h2>
+                
+                <p>We received a request to reset the password for your FrameStack account.</p>
+                
+                <center>
+                    <a href="{reset_link}" class="button">Reset My Password</a>
+                </center>
+                
+                <p><strong>Or copy and paste this link:</strong><br>
+                <code style="background: #f4f4f4; padding: 10px; display: block; margin: 10px 0; word-break: break-all;">
+                    {reset_link}
+                </code></p>
+                
+                <div class="warning">
+                    <strong>⏰ This link expires in 24 hours</strong><br>
+                    For security reasons, this password reset link will expire in 24 hours.
+                </div>
+                
+                <p><strong>Didn't request this?</strong><br>
+                If you didn't request a password reset, you can safely ignore this email. 
+                Your password won't be changed.</p>
+                
+                <p>For additional help, contact our support team.</p>
+            </div>
+            
+            <div class="footer">
+                <p>© 2024 FrameStack. All rights reserved.<br>
+                This is an automated message, please do not reply.</p>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+
+
+CASES = [
+    (
+        'welcome',
+        lambda: legacy_welcome('Ada Lovelace'),
+        lambda: render_email('welcome', name='Ada Lovelace', frontend_url='https://framestack.onrender.com'),
+    ),
+    (
+        'password_reset',
+        lambda: legacy_password_reset('Ada Lovelace', 'https://framestack.onrender.com/reset-password/MQ/abc-123/'),
+        lambda: render_email(
+            'password_reset',
+            name='Ada Lovelace',
+            reset_link='https://framestack.onrender.com/reset-password/MQ/abc-123/',
+        ),
+    ),
+]
+
+
+class Command(BaseCommand):
+    help = "Compare render time and payload size of the email template registry against the old f-strings"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        self.stdout.write(f"{'template':<16} {'impl':<10} {'us/render':>10} {'bytes':>8}")
+
+        for name, legacy, registry in CASES:
+            for impl, render in (('f-string', legacy), ('registry', registry)):
+                seconds = timeit.timeit(render, number=iterations)
+                size = len(render().encode('utf-8'))
+                self.stdout.write(
+                    f"{name:<16} {impl:<10} {seconds / iterations * 1e6:>10.2f} {size:>8}"
+                )
@@ -0,0 +1,49 @@
+# management/commands/brevo_standin.py
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from mailer.brevo_standin import BrevoStandIn
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local stand-in for Brevo's transactional email endpoint. "
+        "Start the app with BREVO_API_HOST=http://<host>:<port>/v3 to send to it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8025)
+        parser.add_argument('--latency-ms', type=float, default=50, help="Fixed delay per request")
+        parser.add_argument('--jitter-ms', type=float, default=0, help="Extra random delay, 0..jitter")
+        parser.add_argument('--error-rate', type=float, default=0, help="Fraction of requests answered with 500")
+        parser.add_argument('--throttle-rate', type=float, default=0, help="Fraction of requests answered with 429")
+        parser.add_argument('--retry-after', type=int, default=1, help="Seconds sent in x-sib-ratelimit-reset")
+        parser.add_argument('--api-key', default=None, help="Reject requests without this api-key header")
+        parser.add_argument('--verbose', action='store_true', help="Log every request")
+
+    def handle(self, *args, **options):
+        try:
+            server = BrevoStandIn(
+                host=options['host'],
+                port=options['port'],
+                latency=options['latency_ms'] / 1000,
+                jitter=options['jitter_ms'] / 1000,
+                error_rate=options['error_rate'],
+                throttle_rate=options['throttle_rate'],
+                retry_after=options['retry_after'],
+                api_key=options['api_key'],
+                verbose=options['verbose'],
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Brevo stand-in listening on {server.url} (Ctrl-C to stop)"))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(json.dumps(server.stats.snapshot(), indent=2))
@@ -0,0 +1,94 @@
+# management/commands/replay_failed_emails.py
+from django.core.management.base import BaseCommand
+from django.db.models import F
+from django.utils import timezone
+
+from utils.brevo_email import brevo_email_sender
+from utils.email_executor import get_email_executor
+from ...models import FailedEmail
+
+
+class Command(BaseCommand):
+    help = "Replay emails from the dead-letter store through the Brevo API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Maximum number of emails to replay")
+        parser.add_argument('--batch-size', type=int, default=100, help="Emails sent in parallel per batch")
+        parser.add_argument('--ids', type=int, nargs='+', help="Only replay these FailedEmail ids")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the emails that would be replayed")
+
+    def handle(self, *args, **options):
+        queryset = FailedEmail.objects.filter(replayed_at__isnull=True).order_by('id')
+        if options['ids']:
+            queryset = queryset.filter(id__in=options['ids'])
+        if options['limit']:
+            queryset = queryset[:options['limit']]
+
+        if options['dry_run']:
+            self.stdout.write(f"{queryset.count()} failed emails would be replayed.")
+            return
+
+        executor = get_email_executor()
+        batch = []
+        sent = failed = 0
+
+        for failed_email in queryset.iterator(chunk_size=options['batch_size']):
+            batch.append(failed_email)
+            if len(batch) >= options['batch_size']:
+                ok, ko = self._replay_batch(executor, batch)
+                sent, failed = sent + ok, failed + ko
+                batch = []
+
+        if batch:
+            ok, ko = self._replay_batch(executor, batch)
+            sent, failed = sent + ok, failed + ko
+
+        self.stdout.write(self.style.SUCCESS(f"{sent} emails replayed, {failed} still failing."))
+
+    def _replay_batch(self, executor, batch):
+        # Send the whole batch in parallel on the email worker pool, then
+        # record the outcome with two set-based UPDATEs.
+        jobs = []
+        for failed_email in batch:
+            if failed_email.message_versions:
+                future = executor.submit(
+                    brevo_email_sender.send_batch,
+                    subject=failed_email.subject,
+                    recipients=failed_email.message_versions,
+                    html_content=failed_email.html_content,
+                    text_content=failed_email.text_content,
+                    from_email=failed_email.from_email,
+                    from_name=failed_email.from_name,
+                    dead_letter=False,
+                )
+            else:
+                future = executor.submit(
+                    brevo_email_sender.send_email,
+                    subject=failed_email.subject,
+                    to_emails=failed_email.to_emails,
+                    text_content=failed_email.text_content,
+                    html_content=failed_email.html_content,
+                    from_email=failed_email.from_email,
+                    from_name=failed_email.from_name,
+                    dead_letter=False,
+                )
+            jobs.append((failed_email.id, future))
+
+        sent_ids, failed_ids = [], []
+        for failed_email_id, future in jobs:
+            try:
+                success = future is not None and future.result()
+            except Exception:
+                success = False
+            (sent_ids if success else failed_ids).append(failed_email_id)
+
+        now = timezone.now()
+        if sent_ids:
+            FailedEmail.objects.filter(id__in=sent_ids).update(
+                replayed_at=now, last_attempt_at=now, attempts=F('attempts') + 1
+            )
+        if failed_ids:
+            FailedEmail.objects.filter(id__in=failed_ids).update(
+                last_attempt_at=now, attempts=F('attempts') + 1
+            )
+        return len(sent_ids), len(failed_ids)
@@ -0,0 +1,70 @@
+# management/commands/send_announcement.py
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.brevo_email import send_bulk_email
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Send an announcement (plan change, maintenance notice, ...) to every user "
+        "through Brevo batch requests. The subject and body may use "
+        "{{ params.name }}, {{ params.email }}, {{ params.plan }} and {{ params.credit }}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subject', required=True, help="Email subject")
+        parser.add_argument('--html-file', help="Path to the HTML body")
+        parser.add_argument('--text', help="Plain text body (also used when no HTML file is given)")
+        parser.add_argument('--plan', help="Only send to users on this plan")
+        parser.add_argument('--include-inactive', action='store_true', help="Also send to inactive users")
+        parser.add_argument('--chunk-size', type=int, default=None, help="Recipients per Brevo request")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the recipients")
+
+    def handle(self, *args, **options):
+        if not options['html_file'] and not options['text']:
+            raise CommandError("Provide --html-file and/or --text.")
+
+        html_content = None
+        if options['html_file']:
+            with open(options['html_file'], encoding='utf-8') as f:
+                html_content = f.read()
+        else:
+            html_content = f"<p>{options['text']}</p>"
+
+        users = User.objects.all()
+        if not options['include_inactive']:
+            users = users.filter(is_active=True)
+        if options['plan']:
+            users = users.filter(plan=options['plan'])
+
+        if options['dry_run']:
+            self.stdout.write(f"{users.count()} users would receive '{options['subject']}'.")
+            return
+
+        # Stream rows instead of loading the whole table into memory
+        rows = users.order_by('id').values_list('email', 'name', 'plan', 'credit').iterator(chunk_size=2000)
+        recipients = (
+            {
+                "email": email,
+                "name": name,
+                "params": {"name": name, "email": email, "plan": plan, "credit": credit},
+            }
+            for email, name, plan, credit in rows
+        )
+
+        summary = send_bulk_email(
+            subject=options['subject'],
+            recipients=recipients,
+            html_content=html_content,
+            text_content=options['text'],
+            chunk_size=options['chunk_size'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Announcement sent to {summary['recipients'] - summary['failed_recipients']} users "
+            f"in {summary['batches']} batches ({summary['failed_batches']} batches failed, "
+            f"{summary['suppressed']} suppressed addresses skipped)."
+        ))
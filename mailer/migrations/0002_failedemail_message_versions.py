@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='failedemail',
+            name='message_versions',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
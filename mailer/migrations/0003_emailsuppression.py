@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mailer', '0002_failedemail_message_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmailSuppression',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('reason', models.CharField(choices=[('hard_bounce', 'Hard bounce'), ('invalid_email', 'Invalid email'), ('blocked', 'Blocked'), ('spam', 'Spam complaint'), ('unsubscribed', 'Unsubscribed')], max_length=20)),
+                ('detail', models.TextField(blank=True)),
+                ('message_id', models.CharField(blank=True, max_length=255)),
+                ('event_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import models
+
+
+class FailedEmail(models.Model):
+    """
+    Dead-letter store for emails that Brevo still rejected after all retries.
+    Replayed in bulk with `python manage.py replay_failed_emails`.
+    """
+    subject = models.CharField(max_length=255)
+    to_emails = models.JSONField(default=list)
+    text_content = models.TextField(blank=True, null=True)
+    html_content = models.TextField(blank=True, null=True)
+    from_email = models.CharField(max_length=254, blank=True, null=True)
+    from_name = models.CharField(max_length=100, blank=True, null=True)
+    # Per-recipient versions of a batch send ({"email", "name", "params"})
+    message_versions = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    status_code = models.PositiveIntegerField(blank=True, null=True)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_attempt_at = models.DateTimeField(auto_now=True)
+    replayed_at = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    class Meta:
+        ordering = ['created_at']
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to_emails)}"
+
+
+class EmailSuppression(models.Model):
+    """
+    Addresses Brevo reported as undeliverable or unwanted (via the webhook
+    in mailer.views). send_email_async_api skips them, except unsubscribed
+    addresses, which only send_bulk_email (marketing) skips.
+    """
+    REASON_CHOICES = [
+        ('hard_bounce', 'Hard bounce'),
+        ('invalid_email', 'Invalid email'),
+        ('blocked', 'Blocked'),
+        ('spam', 'Spam complaint'),
+        ('unsubscribed', 'Unsubscribed'),
+    ]
+
+    email = models.EmailField(unique=True)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    # Brevo's description of the bounce/complaint, for support
+    detail = models.TextField(blank=True)
+    message_id = models.CharField(max_length=255, blank=True)
+    event_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.email} ({self.reason})"
@@ -0,0 +1,50 @@
+# views.py - Brevo webhooks
+import hmac
+import logging
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from utils.email_suppression import record_brevo_events
+
+logger = logging.getLogger(__name__)
+
+
+class BrevoWebhookView(APIView):
+    """
+    Receives Brevo transactional webhooks (hard_bounce, blocked, spam,
+    invalid_email, unsubscribed, ...) and adds the addresses to the
+    suppression list.
+
+    Configure the webhook URL in Brevo as
+    https://<host>/api/v1/webhooks/brevo/?token=<BREVO_WEBHOOK_SECRET>
+    (an "Authorization: Bearer <secret>" header works too).
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        if not self._authorized(request):
+            return Response({"detail": "Invalid webhook token."}, status=status.HTTP_403_FORBIDDEN)
+
+        # Brevo posts one event per request, or a list when batching is enabled
+        events = request.data if isinstance(request.data, list) else [request.data]
+        events = [event for event in events if isinstance(event, dict)]
+
+        suppressed = record_brevo_events(events)
+        return Response({"received": len(events), "suppressed": suppressed})
+
+    def _authorized(self, request):
+        secret = getattr(settings, 'BREVO_WEBHOOK_SECRET', None)
+        if not secret:
+            logger.error("[ERROR] BREVO_WEBHOOK_SECRET is not set; rejecting Brevo webhook")
+            return False
+
+        token = request.query_params.get('token', '')
+        auth_header = request.headers.get('Authorization', '')
+        if auth_header.startswith('Bearer '):
+            token = auth_header[len('Bearer '):]
+        return hmac.compare_digest(token.encode(), secret.encode())
@@ -0,0 +1,201 @@
+# message/digest.py - Contact form notifications for the admin/support team
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from utils.brevo_email import brevo_email_sender
+from utils.email_executor import get_email_executor
+from utils.email_templates import render_email
+
+from .models import ContactMessage
+
+logger = logging.getLogger(__name__)
+
+FLUSH_LOCK_KEY = "contact-digest:flush"
+
+
+def get_admin_emails():
+    return getattr(settings, 'ADMIN_EMAIL_LIST', ['admin@framestack.com', 'support@framestack.com'])
+
+
+def _ticket_number(contact_message):
+    return f"CONTACT-{contact_message.id:05d}"
+
+
+def _submitted_at(contact_message):
+    return contact_message.created_at.strftime('%B %d, %Y at %I:%M %p')
+
+
+def build_admin_notification(contact_message):
+    """Subject, plain text and HTML of the admin email for one contact message."""
+    ticket_number = _ticket_number(contact_message)
+
+    subject = f'New Contact Form Submission - {ticket_number}'
+
+    # Plain text version for admins
+    plain_message = f"""
+New contact form submission received:
+
+Reference: {ticket_number}
+Date: {_submitted_at(contact_message)}
+
+From: {contact_message.name}
+Email: {contact_message.email}
+
+Message:
+{contact_message.message}
+
+---
+Please respond within 24-48 hours.
+View in admin panel: {settings.FRONTEND_URL}/admin/contact/{contact_message.id}
+"""
+
+    # HTML version for admins
+    html_message = render_email(
+        'contact_admin_notification',
+        name=contact_message.name,
+        email=contact_message.email,
+        message=contact_message.message,
+        message_id=contact_message.id,
+        ticket_number=ticket_number,
+        submitted_at=_submitted_at(contact_message),
+        frontend_url=settings.FRONTEND_URL,
+    )
+    return subject, plain_message, html_message
+
+
+def build_admin_digest(contact_messages):
+    """Subject, plain text and HTML of one summary email for several contact messages."""
+    count = len(contact_messages)
+    first_at = _submitted_at(contact_messages[0])
+    last_at = _submitted_at(contact_messages[-1])
+
+    subject = f'Contact Form Digest - {count} new submissions'
+
+    sections = []
+    for contact_message in contact_messages:
+        sections.append(
+            f"Reference: {_ticket_number(contact_message)}\n"
+            f"Date: {_submitted_at(contact_message)}\n"
+            f"From: {contact_message.name} <{contact_message.email}>\n\n"
+            f"{contact_message.message}\n\n"
+            f"View in admin panel: {settings.FRONTEND_URL}/admin/contact/{contact_message.id}\n"
+        )
+    plain_message = (
+        f"{count} new contact form submissions ({first_at} - {last_at}):\n\n"
+        + "\n---\n\n".join(sections)
+        + "\n---\nPlease respond within 24-48 hours.\n"
+    )
+
+    html_message = render_email(
+        'contact_admin_digest',
+        count=count,
+        first_at=first_at,
+        last_at=last_at,
+        frontend_url=settings.FRONTEND_URL,
+        submissions=[
+            {
+                "name": contact_message.name,
+                "email": contact_message.email,
+                "message": contact_message.message,
+                "message_id": contact_message.id,
+                "ticket_number": _ticket_number(contact_message),
+                "submitted_at": _submitted_at(contact_message),
+            }
+            for contact_message in contact_messages
+        ],
+    )
+    return subject, plain_message, html_message
+
+
+def _claim_pending(limit):
+    # Mark the rows before sending so two runners never report the same
+    # message; skip_locked lets a concurrent runner take the next rows.
+    with transaction.atomic():
+        claimed = list(
+            ContactMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(admin_notified_at__isnull=True)
+            .order_by('id')[:limit]
+        )
+        if claimed:
+            ContactMessage.objects.filter(id__in=[m.id for m in claimed]).update(admin_notified_at=timezone.now())
+    return claimed
+
+
+def send_contact_digest(max_items=None):
+    """
+    Send every contact message the admins have not been told about yet,
+    at most ``max_items`` per email. A single pending message gets the
+    usual per-message notification. Returns the number of messages sent.
+    """
+    max_items = max_items or getattr(settings, 'CONTACT_DIGEST_MAX_ITEMS', 50)
+    admin_emails = get_admin_emails()
+    total = 0
+
+    while True:
+        claimed = _claim_pending(max_items)
+        if not claimed:
+            break
+
+        if len(claimed) == 1:
+            subject, plain_message, html_message = build_admin_notification(claimed[0])
+        else:
+            subject, plain_message, html_message = build_admin_digest(claimed)
+
+        # Synchronous send: callers run on a worker or in the cron job.
+        # Failures end up in the dead-letter store for replay.
+        brevo_email_sender.send_email(
+            subject=subject,
+            to_emails=admin_emails,
+            text_content=plain_message,
+            html_content=html_message,
+        )
+        total += len(claimed)
+        logger.info(f"Admin digest sent for {len(claimed)} contact messages")
+
+        if len(claimed) < max_items:
+            break
+
+    return total
+
+
+def flush_contact_digest_if_due():
+    """
+    Queue a digest on the email workers once CONTACT_DIGEST_BATCH_SIZE
+    messages are pending, or once the oldest pending message has waited
+    CONTACT_DIGEST_INTERVAL minutes, instead of waiting for the next
+    scheduled run (order/reset_cron_runner.py).
+    """
+    batch_size = getattr(settings, 'CONTACT_DIGEST_BATCH_SIZE', 0)
+    interval = getattr(settings, 'CONTACT_DIGEST_INTERVAL', 15)
+    pending = ContactMessage.objects.filter(admin_notified_at__isnull=True).aggregate(
+        count=Count('id'), oldest=Min('created_at')
+    )
+    if not pending['count']:
+        return None
+    full = batch_size and pending['count'] >= batch_size
+    overdue = pending['oldest'] <= timezone.now() - timedelta(minutes=interval)
+    if not (full or overdue):
+        return None
+    # One flush at a time across all workers
+    if not cache.add(FLUSH_LOCK_KEY, 1, 60):
+        return None
+
+    def _flush():
+        close_old_connections()
+        try:
+            return send_contact_digest()
+        finally:
+            cache.delete(FLUSH_LOCK_KEY)
+            close_old_connections()
+
+    future = get_email_executor().submit(_flush)
+    if future is None:
+        cache.delete(FLUSH_LOCK_KEY)
+    return future
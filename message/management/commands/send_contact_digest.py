@@ -0,0 +1,20 @@
+# management/commands/send_contact_digest.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...digest import send_contact_digest
+
+
+class Command(BaseCommand):
+    help = "Send the admins one summary email for all contact messages they have not been told about yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-items', type=int, default=None, help="Contact messages per digest email")
+
+    def handle(self, *args, **options):
+        if not getattr(settings, 'CONTACT_DIGEST_ENABLED', True):
+            self.stdout.write("Contact digest is disabled.")
+            return
+
+        sent = send_contact_digest(max_items=options.get('max_items'))
+        self.stdout.write(self.style.SUCCESS(f"{sent} contact messages included in the admin digest."))
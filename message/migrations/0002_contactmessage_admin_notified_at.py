@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 03:56
+
+from django.db import migrations, models
+
+
+def mark_existing_notified(apps, schema_editor):
+    # Messages received before the digest existed were already sent to the admins
+    ContactMessage = apps.get_model('message', 'ContactMessage')
+    ContactMessage.objects.filter(admin_notified_at__isnull=True).update(admin_notified_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('message', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='admin_notified_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_notified, migrations.RunPython.noop),
+    ]
@@ -5,6 +5,8 @@ class ContactMessage(models.Model):
     email = models.EmailField()
     message = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set once the admins have been told about this message (directly or in a digest)
+    admin_notified_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} - {self.email}"
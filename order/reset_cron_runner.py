@@ -6,13 +6,24 @@ import schedule
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "framestack.settings")
 django.setup()
 
+from django.conf import settings
 from django.core.management import call_command
 
 def run_reset_job():
     call_command("reset_expired_plans")
 
+def run_contact_digest_job():
+    call_command("send_contact_digest")
+
+def run_reconcile_unread_job():
+    call_command("reconcile_unread_counters")
+
 # Run daily at midnight (server time)
 schedule.every().day.at("00:00").do(run_reset_job)
+# Contact form admin digest
+schedule.every(settings.CONTACT_DIGEST_INTERVAL).minutes.do(run_contact_digest_job)
+# Safety net for the chat unread counters; they are kept exact on every write
+schedule.every().day.at("03:30").do(run_reconcile_unread_job)
 
 while True:
     schedule.run_pending()
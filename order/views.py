@@ -15,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 
 from utils.brevo_email import send_email_async_api
+from utils.email_templates import render_email
 
 # 💳 1️⃣ Dummy Payment View (Simulates successful payment)
 send_email_async = send_email_async_api
@@ -86,37 +87,14 @@ You can now start creating websites using your credits.
 — The FrameStack Team
 """
 
-        message_html = f"""
-<html>
-  <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-    <h2 style="color: #4F46E5;">Welcome to FrameStack 🎉</h2>
-    <p>Hi <strong>{user.name or 'User'}</strong>,</p>
-    <p>Thank you for purchasing the <strong>{plan.title()}</strong> plan! Your payment was successful.</p>
-
-    <div style="background: #f8f9fa; padding: 15px; border-radius: 8px;">
-      <h3>Plan Details:</h3>
-      <ul>
-        <li><strong>Plan:</strong> {plan.title()}</li>
-        <li><strong>Credits Added:</strong> {added_credits}</li>
-        <li><strong>Total Credits:</strong> {user.credit}</li>
-      </ul>
-    </div>
-
-    <p>Start building amazing websites from your dashboard!</p>
-
-    <a href="{settings.FRONTEND_URL}/dashboard" 
-       style="background: #4F46E5; color: white; padding: 10px 20px; text-decoration: none; border-radius: 6px;">
-       Go to Dashboard →
-    </a>
-
-    <hr style="border: none; border-top: 1px solid #eee; margin: 30px 0;">
-    <p style="font-size: 12px; color: #666;">
-      The FrameStack Team<br>
-      <a href="{settings.FRONTEND_URL}" style="color: #4F46E5;">framestack.com</a>
-    </p>
-  </body>
-</html>
-"""
+        message_html = render_email(
+            'plan_purchase',
+            name=user.name or 'User',
+            plan=plan.title(),
+            credits=added_credits,
+            total_credits=user.credit,
+            frontend_url=settings.FRONTEND_URL,
+        )
 
         send_email_async(
             subject=subject,
@@ -26,6 +26,7 @@ from .serializers import (
     ResetPasswordSerializer,
 )
 from utils.brevo_email import send_email_async_api
+from utils.email_templates import render_email
 # Initialize logger
 
 
@@ -74,48 +75,11 @@ class RegisterView(generics.CreateAPIView):
         )
         
         # HTML version
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px 10px 0 0; text-align: center; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-                .button {{ display: inline-block; padding: 12px 30px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; margin-top: 20px; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎉 Welcome to FrameStack!</h1>
-                </div>
-                <div class="content">
-                    <h2>Hello {user.name}!</h2>
-                    <p>Thank you for creating an account with FrameStack. We're thrilled to have you as part of our community!</p>
-                    
-                    <h3>Here's what you can do next:</h3>
-                    <ul>
-                        <li>✨ Complete your profile</li>
-                        <li>🚀 Explore our features</li>
-                        <li>💎 Choose a plan that suits your needs</li>
-                    </ul>
-                    
-                    <center>
-                        <a href="https://framestack.onrender.com/dashboard" class="button">Go to Dashboard</a>
-                    </center>
-                    
-                    <p style="margin-top: 30px;">If you have any questions, our support team is here to help!</p>
-                </div>
-                <div class="footer">
-                    <p>© 2024 FrameStack. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_message = render_email(
+            'welcome',
+            name=user.name,
+            frontend_url=settings.FRONTEND_URL,
+        )
         
         # Send welcome email asynchronously
         send_email_async(subject, message, [user.email], html_message)
@@ -155,7 +119,7 @@ class LoginView(generics.GenericAPIView):
                     f'If this wasn\'t you, please change your password immediately.\n\n'
                     f'— The FrameStack Security Team'
                 )
-                send_email_async(subject, message, [user.email])
+                send_email_async(subject, message, [user.email], template='login_notification')
             
             return Response({
                 'access': str(refresh.access_token),
@@ -227,46 +191,11 @@ class ChangePasswordView(generics.UpdateAPIView):
             f'The FrameStack Security Team 🔒'
         )
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .alert {{ background: #fff3cd; border: 1px solid #ffc107; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                .success {{ background: #d4edda; border: 1px solid #28a745; padding: 15px; border-radius: 5px; }}
-                .button {{ display: inline-block; padding: 10px 20px; background-color: #dc3545; color: white; text-decoration: none; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="success">
-                    <h2>✅ Password Changed Successfully</h2>
-                </div>
-                
-                <p>Hello {user.name},</p>
-                <p>Your password has been changed successfully.</p>
-                
-                <div class="alert">
-                    <strong>⚠️ Security Alert</strong><br>
-                    If you didn't make this change, your account may be compromised.
-                    <br><br>
-                    <a href="https://framestack.onrender.com/forgot-password" class="button">Reset Password Now</a>
-                </div>
-                
-                <p>For your security, please:</p>
-                <ul>
-                    <li>Never share your password with anyone</li>
-                    <li>Use a unique password for FrameStack</li>
-                    <li>Enable two-factor authentication if available</li>
-                </ul>
-                
-                <p>Best regards,<br>The FrameStack Security Team 🔒</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_message = render_email(
+            'password_changed',
+            name=user.name,
+            frontend_url=settings.FRONTEND_URL,
+        )
         
         send_email_async(subject, message, [user.email], html_message)
 
@@ -312,63 +241,14 @@ class ForgotPasswordView(generics.GenericAPIView):
                 f'— The FrameStack Team'
             )
             
-            html_message = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; background: #f9f9f9; }}
-                    .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; margin-bottom: 30px; }}
-                    .content {{ background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                    .button {{ display: inline-block; padding: 15px 40px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; text-decoration: none; border-radius: 5px; font-weight: bold; margin: 20px 0; }}
-                    .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-                    .warning {{ background: #fff3cd; border-left: 4px solid #ffc107; padding: 10px; margin: 20px 0; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>🔒 Password Reset Request</h1>
-                    </div>
-                    
-                    <div class="content">
-                        <h2>Hello {user.name}!</h2>
-                        
-                        <p>We received a request to reset the password for your FrameStack account.</p>
-                        
-                        <center>
-                            <a href="{reset_link}" class="button">Reset My Password</a>
-                        </center>
-                        
-                        <p><strong>Or copy and paste this link:</strong><br>
-                        <code style="background: #f4f4f4; padding: 10px; display: block; margin: 10px 0; word-break: break-all;">
-                            {reset_link}
-                        </code></p>
-                        
-                        <div class="warning">
-                            <strong>⏰ This link expires in 24 hours</strong><br>
-                            For security reasons, this password reset link will expire in 24 hours.
-                        </div>
-                        
-                        <p><strong>Didn't request this?</strong><br>
-                        If you didn't request a password reset, you can safely ignore this email. 
-                        Your password won't be changed.</p>
-                        
-                        <p>For additional help, contact our support team.</p>
-                    </div>
-                    
-                    <div class="footer">
-                        <p>© 2024 FrameStack. All rights reserved.<br>
-                        This is an automated message, please do not reply.</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
+            html_message = render_email(
+                'password_reset',
+                name=user.name,
+                reset_link=reset_link,
+            )
             
             # Send email asynchronously
-            send_email_async(subject, message, [email], html_message)
+            send_email_async(subject, message, [email], html_message, template='password_reset')
             
             logger.info(f"Password reset email sent to {email}")
             
@@ -425,37 +305,11 @@ class ResetPasswordView(generics.GenericAPIView):
             f'— The FrameStack Team'
         )
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .success {{ background: #d4edda; border: 1px solid #28a745; padding: 20px; border-radius: 5px; text-align: center; }}
-                .button {{ display: inline-block; padding: 12px 30px; background-color: #28a745; color: white; text-decoration: none; border-radius: 5px; margin-top: 20px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="success">
-                    <h2>✅ Password Reset Successful!</h2>
-                </div>
-                
-                <p>Hello {user.name},</p>
-                <p>Your password has been successfully reset. You can now log in with your new password.</p>
-                
-                <center>
-                    <a href="https://framestack.onrender.com/login" class="button">Login Now</a>
-                </center>
-                
-                <p style="margin-top: 30px;">If you didn't make this change, please contact our support team immediately.</p>
-                
-                <p>Best regards,<br>The FrameStack Team</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_message = render_email(
+            'password_reset_done',
+            name=user.name,
+            frontend_url=settings.FRONTEND_URL,
+        )
         
         send_email_async(subject, message, [user.email], html_message)
         
@@ -595,55 +449,14 @@ class VerifyPaymentView(APIView):
             f'— The FrameStack Team'
         )
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .success {{ background: #d4edda; border: 1px solid #28a745; padding: 20px; border-radius: 5px; }}
-                .receipt {{ background: #f8f9fa; padding: 20px; border-radius: 5px; margin: 20px 0; }}
-                .receipt-row {{ display: flex; justify-content: space-between; padding: 10px 0; border-bottom: 1px solid #dee2e6; }}
-                .total {{ font-size: 18px; font-weight: bold; color: #28a745; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="success">
-                    <h2>💳 Payment Successful!</h2>
-                </div>
-                
-                <p>Hello {user.name},</p>
-                <p>Thank you for your purchase! Your payment has been processed successfully.</p>
-                
-                <div class="receipt">
-                    <h3>Transaction Receipt</h3>
-                    <div class="receipt-row">
-                        <span>Payment ID:</span>
-                        <span>{payment_id}</span>
-                    </div>
-                    <div class="receipt-row">
-                        <span>Plan:</span>
-                        <span>{plan}</span>
-                    </div>
-                    <div class="receipt-row">
-                        <span>Credits Added:</span>
-                        <span>{credits}</span>
-                    </div>
-                    <div class="receipt-row total">
-                        <span>Total Credits:</span>
-                        <span>{user.credit}</span>
-                    </div>
-                </div>
-                
-                <p>You can now use your credits to access premium features.</p>
-                
-                <p>Best regards,<br>The FrameStack Team</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_message = render_email(
+            'payment_success',
+            name=user.name,
+            payment_id=payment_id,
+            plan=plan,
+            credits=credits,
+            total_credits=user.credit,
+        )
         
         send_email_async(subject, message, [user.email], html_message)
         
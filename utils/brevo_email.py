@@ -1,34 +1,78 @@
 # utils/brevo_email.py
 import logging
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from threading import Lock, Timer
 from django.conf import settings
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
-from threading import Thread
+
+from utils.email_executor import get_email_executor
+from utils.email_suppression import suppression_list
+from utils.email_throttle import ALLOWED, RATE_LIMITED, get_email_throttle
 
 logger = logging.getLogger(__name__)
 
+# Brevo accepts at most 1000 message versions per send_transac_email call
+BREVO_MAX_MESSAGE_VERSIONS = 1000
+
 class BrevoEmailSender:
     """
     Brevo API email sender that works on Render.com and other platforms
     that block SMTP ports.
+    
+    The sib_api_v3_sdk client is built on first use, so importing this
+    module (every view, manage.py command and the cron runner does) stays
+    cheap. One client is shared by all threads; its urllib3 pool keeps a
+    kept-alive TLS connection per email worker.
     """
     
     def __init__(self):
+        self._api_instance = None
+        self._lock = Lock()
+    
+    @property
+    def api_instance(self):
+        if self._api_instance is None:
+            with self._lock:
+                if self._api_instance is None:
+                    self._api_instance = self._build_api_instance()
+        return self._api_instance
+    
+    def _build_api_instance(self):
+        import sib_api_v3_sdk
+        
         # Configure API key authorization
         configuration = sib_api_v3_sdk.Configuration()
         configuration.api_key['api-key'] = settings.BREVO_API_KEY
+        configuration.host = getattr(settings, 'BREVO_API_HOST', configuration.host)
+        
+        # One pooled connection per worker that can call Brevo at the same
+        # time (plus the request thread for caller_runs); connections beyond
+        # maxsize would be closed after each send and pay a new handshake.
+        configuration.connection_pool_maxsize = getattr(
+            settings, 'BREVO_CONNECTION_POOL_SIZE', getattr(settings, 'EMAIL_WORKER_THREADS', 4) + 1
+        )
         
         # Create API instance
-        self.api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
+        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(
             sib_api_v3_sdk.ApiClient(configuration)
         )
         
         logger.info("Brevo API email sender initialized")
+        return api_instance
     
-    def send_email(self, subject, to_emails, text_content=None, html_content=None, from_email=None, from_name=None):
+    def send_email(self, subject, to_emails, text_content=None, html_content=None, from_email=None, from_name=None,
+                   dead_letter=True):
         """
         Send email using Brevo API.
         
+        Rate-limit (429), 5xx and connection errors are retried with jittered
+        exponential backoff, honouring Retry-After. If the email still cannot
+        be delivered it is saved to the FailedEmail dead-letter table.
+        
         Args:
             subject: Email subject
             to_emails: List of recipient email addresses
@@ -36,50 +80,286 @@ class BrevoEmailSender:
             html_content: HTML content
             from_email: Sender email (must be verified in Brevo)
             from_name: Sender name
+            dead_letter: Save the email to FailedEmail if it fails
         
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Prepare sender
-            sender = {
-                "email": from_email or settings.DEFAULT_FROM_EMAIL,
-                "name": from_name or "FrameStack"
-            }
+        payload = build_email_payload(subject, to_emails, text_content, html_content, from_email, from_name)
+        
+        return self._deliver(
+            payload,
+            to_emails,
+            dead_letter=dead_letter,
+            subject=subject,
+            text_content=text_content,
+            html_content=html_content,
+            from_email=from_email,
+            from_name=from_name,
+        )
+    
+    def send_batch(self, subject, recipients, html_content, text_content=None, from_email=None, from_name=None,
+                   dead_letter=True):
+        """
+        Send one email to many recipients in a single Brevo API call.
+        
+        Each recipient becomes its own message version, so nobody sees the
+        other addresses and the content can be personalised with Brevo
+        params, e.g. "Hello {{ params.name }}".
+        
+        Args:
+            subject: Email subject (may use {{ params.* }})
+            recipients: List of dicts with "email" and optional "name" and "params"
+            html_content: HTML content (may use {{ params.* }})
+            text_content: Plain text content
+            from_email: Sender email (must be verified in Brevo)
+            from_name: Sender name
+            dead_letter: Save the batch to FailedEmail if it fails
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        recipients = list(recipients)
+        payload = build_batch_payload(subject, recipients, html_content, text_content, from_email, from_name)
+        
+        to_emails = [recipient["email"] for recipient in recipients]
+        return self._deliver(
+            payload,
+            to_emails,
+            dead_letter=dead_letter,
+            subject=subject,
+            text_content=text_content,
+            html_content=html_content,
+            from_email=from_email,
+            from_name=from_name,
+            message_versions=recipients,
+        )
+    
+    def _deliver(self, payload, to_emails, dead_letter=True, **failed_email_fields):
+        """
+        Call the Brevo API, retrying 429, 5xx and connection errors with
+        jittered exponential backoff. Other failures (4xx, bad payloads)
+        are not retried. Saves the email to the dead-letter store when the
+        send fails.
+        """
+        from sib_api_v3_sdk.rest import ApiException
+        from urllib3.exceptions import HTTPError
+        
+        max_retries = getattr(settings, 'EMAIL_MAX_RETRIES', 3)
+        attempt = 0
+        while True:
+            attempt += 1
+            status_code = None
+            retry_after = None
+            try:
+                # Send the email (the SDK posts a plain dict body as-is)
+                api_response = self.api_instance.send_transac_email(payload)
+                
+                log_sent(to_emails, api_response.message_id or api_response.message_ids)
+                return True
+                
+            except ApiException as e:
+                status_code = e.status
+                retry_after = parse_retry_after(e.headers)
+                error = f"Brevo API error: {e}"
+                retryable = is_retryable_status(status_code)
+            except (HTTPError, OSError) as e:
+                # Connection resets, timeouts, DNS failures
+                error = f"Unexpected error sending email: {str(e)}"
+                retryable = True
+            except Exception as e:
+                # A bug or bad payload: retrying would fail the same way
+                error = f"Unexpected error sending email: {str(e)}"
+                retryable = False
             
-            # Prepare recipients
-            to = [{"email": email} for email in to_emails]
+            if not retryable or attempt > max_retries:
+                log_failed(error, attempt)
+                break
             
-            # Create SendSmtpEmail object
-            send_smtp_email = sib_api_v3_sdk.SendSmtpEmail(
-                to=to,
-                sender=sender,
-                subject=subject,
-                html_content=html_content or f"<p>{text_content}</p>",
-                text_content=text_content or "This email requires HTML support."
+            delay = retry_delay(attempt, retry_after)
+            log_retry(error, attempt, delay)
+            time.sleep(delay)
+        
+        if dead_letter:
+            save_failed_email(
+                to_emails=list(to_emails),
+                error=error,
+                status_code=status_code,
+                attempts=attempt,
+                **failed_email_fields,
             )
-            
-            # Send the email
-            api_response = self.api_instance.send_transac_email(send_smtp_email)
-            
-            logger.info(f"[SUCCESS] Email sent via Brevo API to {to_emails}. Message ID: {api_response.message_id}")
-            return True
-            
-        except ApiException as e:
-            logger.error(f"[ERROR] Brevo API error: {e}")
-            return False
-        except Exception as e:
-            logger.error(f"[ERROR] Unexpected error sending email: {str(e)}")
-            return False
+        return False
+
+
+def build_email_payload(subject, to_emails, text_content=None, html_content=None, from_email=None, from_name=None):
+    """
+    Build the JSON body of a Brevo /smtp/email request. Shared by the sync
+    and async senders so both post exactly the same payload.
+    """
+    return {
+        "sender": {
+            "email": from_email or settings.DEFAULT_FROM_EMAIL,
+            "name": from_name or "FrameStack"
+        },
+        "to": [{"email": email} for email in to_emails],
+        "subject": subject,
+        "htmlContent": html_content or f"<p>{text_content}</p>",
+        "textContent": text_content or "This email requires HTML support.",
+    }
+
+
+def build_batch_payload(subject, recipients, html_content, text_content=None, from_email=None, from_name=None):
+    """
+    Build a Brevo /smtp/email body with one message version per recipient.
+    Recipients are dicts with "email" and optional "name" and "params".
+    """
+    if len(recipients) > BREVO_MAX_MESSAGE_VERSIONS:
+        raise ValueError(f"Brevo accepts at most {BREVO_MAX_MESSAGE_VERSIONS} recipients per batch")
+    
+    message_versions = []
+    for recipient in recipients:
+        to = {"email": recipient["email"]}
+        if recipient.get("name"):
+            to["name"] = recipient["name"]
+        version = {"to": [to]}
+        if recipient.get("params"):
+            version["params"] = recipient["params"]
+        message_versions.append(version)
+    
+    payload = {
+        "sender": {
+            "email": from_email or settings.DEFAULT_FROM_EMAIL,
+            "name": from_name or "FrameStack"
+        },
+        "subject": subject,
+        "htmlContent": html_content,
+        "messageVersions": message_versions,
+    }
+    if text_content:
+        payload["textContent"] = text_content
+    return payload
+
+
+def _describe(to_emails):
+    # Keep log lines short for batch sends
+    if len(to_emails) > 5:
+        return f"{len(to_emails)} recipients"
+    return str(to_emails)
+
+
+def log_sent(to_emails, message_id):
+    logger.info(f"[SUCCESS] Email sent via Brevo API to {_describe(to_emails)}. Message ID: {message_id}")
+
+
+def log_retry(error, attempt, delay):
+    logger.warning(f"[WARNING] {error} (attempt {attempt}, retrying in {delay:.1f}s)")
+
+
+def log_failed(error, attempt):
+    logger.error(f"[ERROR] {error} (attempt {attempt}, giving up)")
+
+
+def is_retryable_status(status_code):
+    """429 and 5xx responses are transient; other 4xx errors are not."""
+    return status_code is None or status_code == 429 or status_code >= 500
+
+
+def parse_retry_after(headers):
+    """
+    Return the number of seconds the server asked us to wait, or None.
+    Accepts Retry-After as seconds or an HTTP date, and Brevo's
+    x-sib-ratelimit-reset header.
+    """
+    if not headers:
+        return None
+    
+    for name in ('Retry-After', 'retry-after', 'x-sib-ratelimit-reset'):
+        value = headers.get(name)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    return None
+
+
+def retry_delay(attempt, retry_after=None):
+    """
+    Full-jitter exponential backoff: a random delay up to
+    EMAIL_RETRY_BASE_DELAY * 2**(attempt - 1), capped at EMAIL_RETRY_MAX_DELAY.
+    A server-provided Retry-After is used as the lower bound.
+    """
+    base = getattr(settings, 'EMAIL_RETRY_BASE_DELAY', 1.0)
+    cap = getattr(settings, 'EMAIL_RETRY_MAX_DELAY', 30.0)
+    delay = random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def save_failed_email(**fields):
+    """Store an undeliverable email in the dead-letter table."""
+    from django.db import close_old_connections
+    from mailer.models import FailedEmail
+    
+    try:
+        # Worker threads are long-lived; drop connections the DB has timed out
+        close_old_connections()
+        FailedEmail.objects.create(**fields)
+        logger.warning(f"[WARNING] Email to {_describe(fields.get('to_emails', []))} saved to dead-letter store")
+    except Exception as e:
+        logger.error(f"[ERROR] Could not save failed email to dead-letter store: {str(e)}")
 
 # Create a singleton instance
 brevo_email_sender = BrevoEmailSender()
 
-def send_email_async_api(subject, message, recipient_list, html_message=None, from_email=None):
+def send_email_async_api(subject, message, recipient_list, html_message=None, from_email=None, template=None):
     """
     Drop-in replacement for the SMTP send_email_async function.
     Uses Brevo API instead of SMTP.
+
+    The send runs on the shared email worker pool (see utils.email_executor)
+    after passing the throttle in utils.email_throttle. ``template`` names
+    the kind of email (e.g. "password_reset") for the per-recipient
+    cooldowns in EMAIL_THROTTLE_COOLDOWNS.
+
+    Recipients on the suppression list (hard bounces, blocks, spam
+    complaints reported by the Brevo webhook) are skipped.
+
+    Mail over the global rate limit is deferred, not dropped: it is retried
+    once the rate allows, for up to EMAIL_THROTTLE_MAX_DEFER seconds, and
+    then saved to the dead-letter store.
+
+    Returns the job's Future, or None if every recipient was suppressed, the
+    email was in its cooldown, collapsed into an identical pending one, or
+    dropped because the queue was full.
     """
+    return _queue_email(subject, message, recipient_list, html_message, from_email, template)
+
+
+def _queue_email(subject, message, recipient_list, html_message, from_email, template, deadline=None):
+    recipient_list, suppressed = suppression_list.filter(recipient_list)
+    if suppressed:
+        logger.warning(f"[WARNING] Skipping suppressed recipients {_describe(suppressed)} for '{subject}'")
+    if not recipient_list:
+        return None
+    
+    outcome, admitted, release = get_email_throttle().admit(
+        subject, message, recipient_list, html_message, from_email, template
+    )
+    if outcome == RATE_LIMITED:
+        return _defer_email(subject, message, recipient_list, html_message, from_email, template, deadline)
+    recipient_list = admitted
+    if outcome != ALLOWED:
+        logger.warning(f"[WARNING] Email '{subject}' not sent ({outcome})")
+        return None
+    
     def _send():
         try:
             success = brevo_email_sender.send_email(
@@ -94,11 +374,157 @@ def send_email_async_api(subject, message, recipient_list, html_message=None, fr
                 logger.info(f"[SUCCESS] Email queued for delivery to {recipient_list}")
             else:
                 logger.error(f"[ERROR] Failed to queue email to {recipient_list}")
+            return success
                 
         except Exception as e:
             logger.error(f"[ERROR] Exception in email thread: {str(e)}")
+            return False
+        finally:
+            release()
+    
+    # Run on the bounded worker pool
+    future = get_email_executor().submit(_send)
+    if future is None:
+        release()
+    return future
+
+
+def _defer_email(subject, message, recipient_list, html_message, from_email, template, deadline):
+    """Retry a rate-limited email later; returns a Future for the eventual send."""
+    now = time.monotonic()
+    if deadline is None:
+        deadline = now + getattr(settings, 'EMAIL_THROTTLE_MAX_DEFER', 300)
+    delay = get_email_throttle().retry_after()
+    if now + delay > deadline:
+        logger.error(f"[ERROR] Email '{subject}' rate limited for too long")
+        save_failed_email(
+            subject=subject,
+            to_emails=list(recipient_list),
+            text_content=message,
+            html_content=html_message,
+            from_email=from_email,
+            error="Rate limited (EMAIL_GLOBAL_RATE_LIMIT)",
+        )
+        return None
+
+    logger.warning(f"[WARNING] Email '{subject}' rate limited, retrying in {delay:.1f}s")
+    result = Future()
+
+    def _chain(future):
+        if future.cancelled():
+            result.cancel()
+        elif future.exception() is not None:
+            result.set_exception(future.exception())
+        else:
+            result.set_result(future.result())
+
+    def _retry():
+        try:
+            future = _queue_email(subject, message, recipient_list, html_message, from_email, template, deadline)
+        except Exception as e:
+            logger.error(f"[ERROR] Deferred email '{subject}' failed: {str(e)}")
+            result.set_result(False)
+            return
+        if future is None:
+            result.set_result(False)
+        else:
+            future.add_done_callback(_chain)
+
+    timer = Timer(delay, _retry)
+    timer.daemon = True
+    timer.start()
+    return result
+
+
+def send_bulk_email(subject, recipients, html_content, text_content=None, from_email=None, from_name=None,
+                    chunk_size=None, marketing=True):
+    """
+    Send a personalised email to any number of recipients.
+    
+    Recipients are streamed from any iterable (e.g. a queryset iterator),
+    grouped into Brevo batch requests of at most ``chunk_size`` message
+    versions, and the batches are sent in parallel on the email worker
+    pool. At most EMAIL_WORKER_THREADS batches are in flight at once, so
+    memory stays flat however many recipients there are.
+    
+    Args:
+        subject: Email subject (may use {{ params.* }})
+        recipients: Iterable of dicts with "email" and optional "name" and "params"
+        html_content: HTML content (may use {{ params.* }})
+        text_content: Plain text content
+        from_email: Sender email (must be verified in Brevo)
+        from_name: Sender name
+        chunk_size: Recipients per Brevo request (default EMAIL_BULK_CHUNK_SIZE)
+        marketing: Also skip addresses that unsubscribed (announcements)
+    
+    Returns:
+        Dict with the number of recipients and batches sent and failed, and
+        the number of suppressed recipients skipped.
+    """
+    chunk_size = min(
+        chunk_size or getattr(settings, 'EMAIL_BULK_CHUNK_SIZE', BREVO_MAX_MESSAGE_VERSIONS),
+        BREVO_MAX_MESSAGE_VERSIONS,
+    )
+    executor = get_email_executor()
+    max_in_flight = executor.max_workers
+    
+    summary = {"recipients": 0, "batches": 0, "failed_recipients": 0, "failed_batches": 0, "suppressed": 0}
+    in_flight = {}
+    
+    def _collect(done):
+        for future in done:
+            size = in_flight.pop(future)
+            try:
+                success = future.result()
+            except Exception:
+                success = False
+            if not success:
+                summary["failed_batches"] += 1
+                summary["failed_recipients"] += size
+    
+    iterator = iter(recipients)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        
+        # Drop bounced/complained addresses (at most one query per chunk)
+        _, suppressed = suppression_list.filter([recipient["email"] for recipient in chunk], marketing)
+        if suppressed:
+            suppressed = set(suppressed)
+            chunk = [recipient for recipient in chunk if recipient["email"] not in suppressed]
+            summary["suppressed"] += len(suppressed)
+            if not chunk:
+                continue
+        
+        # Backpressure: wait for a batch to finish before queueing another
+        while len(in_flight) >= max_in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            _collect(done)
+        
+        summary["batches"] += 1
+        summary["recipients"] += len(chunk)
+        future = executor.submit(
+            brevo_email_sender.send_batch,
+            subject=subject,
+            recipients=chunk,
+            html_content=html_content,
+            text_content=text_content,
+            from_email=from_email,
+            from_name=from_name,
+        )
+        if future is None:
+            summary["failed_batches"] += 1
+            summary["failed_recipients"] += len(chunk)
+            continue
+        in_flight[future] = len(chunk)
+    
+    if in_flight:
+        done, _ = wait(in_flight)
+        _collect(done)
     
-    # Run in background thread
-    thread = Thread(target=_send)
-    thread.daemon = True
-    thread.start()
\ No newline at end of file
+    logger.info(
+        f"Bulk email '{subject}' sent to {summary['recipients']} recipients in {summary['batches']} batches "
+        f"({summary['failed_batches']} batches failed)"
+    )
+    return summary
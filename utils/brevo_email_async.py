@@ -0,0 +1,210 @@
+# utils/brevo_email_async.py
+import asyncio
+import logging
+from contextlib import asynccontextmanager, nullcontext
+
+import aiohttp
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from utils.brevo_email import (
+    build_batch_payload,
+    build_email_payload,
+    is_retryable_status,
+    log_failed,
+    log_retry,
+    log_sent,
+    parse_retry_after,
+    retry_delay,
+    save_failed_email,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBrevoEmailSender:
+    """
+    asyncio counterpart of BrevoEmailSender for async views and Channels
+    consumers.
+
+    Sends on the server's event loop share one aiohttp session (and its
+    keep-alive connection pool), opened by open() at lifespan startup and
+    closed by aclose() at shutdown; a semaphore caps how many requests are
+    in flight. Sends on any other loop (async_to_sync runs a fresh one per
+    call) use a session of their own, closed before the send returns, so
+    no session outlives its loop. Payloads, retry policy, logging and the
+    dead-letter store are the same as the sync sender's.
+    """
+
+    def __init__(self, concurrency=None):
+        self.concurrency = concurrency or getattr(settings, 'EMAIL_ASYNC_CONCURRENCY', 10)
+        self._session = None
+        self._semaphore = None
+        self._loop = None
+        self._tasks = set()
+
+    def _new_session(self):
+        return aiohttp.ClientSession(
+            base_url=getattr(settings, 'BREVO_API_HOST', 'https://api.brevo.com/v3').rstrip('/') + '/',
+            headers={
+                "api-key": settings.BREVO_API_KEY or "",
+                "accept": "application/json",
+                "content-type": "application/json",
+            },
+            connector=aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=getattr(settings, 'EMAIL_ASYNC_TIMEOUT', 30)),
+        )
+
+    async def open(self):
+        """Open the shared session on the running loop (the server's)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._loop = asyncio.get_running_loop()
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session = self._new_session()
+        logger.info("Async Brevo API email sender initialized")
+
+    @asynccontextmanager
+    async def _session_scope(self):
+        """Yield (session, limiter) for one send and its retries."""
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            yield self._session, self._semaphore
+            return
+        async with self._new_session() as session:
+            yield session, nullcontext()
+
+    async def send_email(self, subject, to_emails, text_content=None, html_content=None, from_email=None,
+                         from_name=None, dead_letter=True):
+        """
+        Send email using Brevo API. Same arguments and return value as
+        BrevoEmailSender.send_email.
+        """
+        payload = build_email_payload(subject, to_emails, text_content, html_content, from_email, from_name)
+        return await self._deliver(
+            payload,
+            to_emails,
+            dead_letter=dead_letter,
+            subject=subject,
+            text_content=text_content,
+            html_content=html_content,
+            from_email=from_email,
+            from_name=from_name,
+        )
+
+    async def send_batch(self, subject, recipients, html_content, text_content=None, from_email=None,
+                         from_name=None, dead_letter=True):
+        """
+        Send one email to many recipients in a single Brevo API call.
+        Same arguments and return value as BrevoEmailSender.send_batch.
+        """
+        recipients = list(recipients)
+        payload = build_batch_payload(subject, recipients, html_content, text_content, from_email, from_name)
+        return await self._deliver(
+            payload,
+            [recipient["email"] for recipient in recipients],
+            dead_letter=dead_letter,
+            subject=subject,
+            text_content=text_content,
+            html_content=html_content,
+            from_email=from_email,
+            from_name=from_name,
+            message_versions=recipients,
+        )
+
+    def send_email_nowait(self, *args, **kwargs):
+        """
+        Fire-and-forget version of send_email for code running on the event
+        loop. Returns the asyncio.Task; pending tasks are awaited by aclose().
+        """
+        task = asyncio.get_running_loop().create_task(self.send_email(*args, **kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _deliver(self, payload, to_emails, dead_letter=True, **failed_email_fields):
+        max_retries = getattr(settings, 'EMAIL_MAX_RETRIES', 3)
+        attempt = 0
+
+        async with self._session_scope() as (session, limiter):
+            while True:
+                attempt += 1
+                status_code = None
+                retry_after = None
+                try:
+                    async with limiter:
+                        async with session.post("smtp/email", json=payload) as response:
+                            if response.status < 400:
+                                log_sent(to_emails, await _message_id(response))
+                                return True
+
+                            status_code = response.status
+                            retry_after = parse_retry_after(response.headers)
+                            error = f"Brevo API error: ({status_code}) {await response.text()}"
+                            retryable = is_retryable_status(status_code)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    # Connection resets, timeouts, DNS failures
+                    error = f"Unexpected error sending email: {str(e) or type(e).__name__}"
+                    retryable = True
+                except Exception as e:
+                    # A bug or bad payload: retrying would fail the same way
+                    error = f"Unexpected error sending email: {str(e) or type(e).__name__}"
+                    retryable = False
+
+                if not retryable or attempt > max_retries:
+                    log_failed(error, attempt)
+                    break
+
+                delay = retry_delay(attempt, retry_after)
+                log_retry(error, attempt, delay)
+                await asyncio.sleep(delay)
+
+        if dead_letter:
+            await sync_to_async(save_failed_email, thread_sensitive=False)(
+                to_emails=list(to_emails),
+                error=error,
+                status_code=status_code,
+                attempts=attempt,
+                **failed_email_fields,
+            )
+        return False
+
+    async def aclose(self, drain=True):
+        """Wait for fire-and-forget sends (unless drain=False) and close the session."""
+        if self._tasks:
+            if drain:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            else:
+                for task in self._tasks:
+                    task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+async def _message_id(response):
+    # The email is accepted at this point: an empty or unexpected body
+    # must not turn the send into a failure (and a duplicate retry)
+    try:
+        body = await response.json(content_type=None)
+    except (ValueError, aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+    if not isinstance(body, dict):
+        return None
+    return body.get("messageId") or body.get("messageIds")
+
+
+# Shared instance; the lifespan handler opens its session on the server loop
+async_brevo_email_sender = AsyncBrevoEmailSender()
+
+
+async def send_email_async_aio(subject, message, recipient_list, html_message=None, from_email=None):
+    """
+    Awaitable counterpart of send_email_async_api with the same signature.
+    """
+    return await async_brevo_email_sender.send_email(
+        subject=subject,
+        to_emails=recipient_list,
+        text_content=message,
+        html_content=html_message,
+        from_email=from_email,
+    )
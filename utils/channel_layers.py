@@ -0,0 +1,463 @@
+# utils/channel_layers.py
+"""
+Channel layers for deployments without Redis (CHANNEL_LAYER_BACKEND):
+
+    LocalChannelLayer     one process only (WEB_CONCURRENCY=1); the
+                          in-memory layer without its per-call costs
+    PostgresChannelLayer  any number of processes sharing the Postgres
+                          database, fanned out with LISTEN/NOTIFY
+
+Both support groups and flush, like channels_redis.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+import queue
+import random
+import select
+import socket
+import string
+import threading
+import time
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import msgpack
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer, InMemoryChannelLayer
+
+logger = logging.getLogger(__name__)
+
+
+def _random_name(length=12):
+    return "".join(random.choice(string.ascii_letters) for _ in range(length))
+
+
+class LocalChannelLayer(InMemoryChannelLayer):
+    """
+    InMemoryChannelLayer tuned for chat fan-out in a single process:
+
+    - messages are shallow-copied per receiver instead of deep-copied
+      (receivers must not mutate nested values; the chat consumers don't)
+    - expired messages and group memberships are swept at most every
+      ``cleanup_interval`` seconds, not on every send and receive, which
+      made each call O(all channels and groups)
+    """
+
+    def __init__(self, cleanup_interval=10, **kwargs):
+        super().__init__(**kwargs)
+        self.cleanup_interval = cleanup_interval
+        self._next_cleanup = 0
+
+    def _maybe_clean(self):
+        now = time.monotonic()
+        if now >= self._next_cleanup:
+            self._next_cleanup = now + self.cleanup_interval
+            self._clean_expired()
+
+    def _put(self, channel, message):
+        queue = self.channels.setdefault(channel, asyncio.Queue())
+        if queue.qsize() >= self.get_capacity(channel):
+            raise ChannelFull(channel)
+        queue.put_nowait((time.time() + self.expiry, dict(message)))
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        assert "__asgi_channel__" not in message
+        self._put(channel, message)
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        self._maybe_clean()
+        queue = self.channels.setdefault(channel, asyncio.Queue())
+        try:
+            while True:
+                expires_at, message = await queue.get()
+                if expires_at >= time.time():
+                    return message
+        finally:
+            if queue.empty() and self.channels.get(channel) is queue:
+                del self.channels[channel]
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Invalid group name"
+        self._maybe_clean()
+        for channel in list(self.groups.get(group, ())):
+            try:
+                self._put(channel, message)
+            except ChannelFull:
+                pass
+
+
+class _PostgresListener(threading.Thread):
+    """
+    Thread that owns the LISTEN connection, so the event loop never waits
+    on Postgres. LISTEN/UNLISTEN are queued to it as commands, and every
+    notification is passed to ``on_notification(payload, connection)`` on
+    this thread. After a lost connection it reconnects every
+    ``reconnect_delay`` seconds and LISTENs again.
+    """
+
+    def __init__(self, connect, on_notification, reconnect_delay):
+        super().__init__(name="channel-layer-listener", daemon=True)
+        self._connect = connect
+        self._on_notification = on_notification
+        self._reconnect_delay = reconnect_delay
+        self._commands = queue.SimpleQueue()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._listening = set()
+        self._waiting = []
+        self._stopped = False
+        self._conn = None
+
+    def submit(self, verb, pg_channel):
+        """Queue LISTEN/UNLISTEN; the future completes once Postgres applied it."""
+        future = Future()
+        self._commands.put((verb, pg_channel, future))
+        self._wakeup_send.send(b"\0")
+        return future
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup_send.send(b"\0")
+
+    def run(self):
+        while not self._stopped:
+            try:
+                if self._conn is None:
+                    self._conn = self._connect()
+                    for pg_channel in self._listening:
+                        self._execute(f'LISTEN "{pg_channel}"')
+                    self._resolve()
+                self._run_commands()
+                readable, _, _ = select.select([self._conn, self._wakeup_recv], [], [], 5)
+                if self._wakeup_recv in readable:
+                    self._wakeup_recv.recv(4096)
+                self._conn.poll()
+                while self._conn.notifies:
+                    self._on_notification(self._conn.notifies.pop(0).payload, self._conn)
+            except Exception as e:
+                if self._stopped:
+                    break
+                logger.error(f"[ERROR] Channel layer lost its Postgres listener: {str(e)}")
+                self._close()
+                time.sleep(self._reconnect_delay)
+        self._close()
+
+    def _run_commands(self):
+        while True:
+            try:
+                verb, pg_channel, future = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            # Recorded first, so a reconnect re-applies it if this fails
+            if verb == "LISTEN":
+                self._listening.add(pg_channel)
+            else:
+                self._listening.discard(pg_channel)
+            self._waiting.append(future)
+            self._execute(f'{verb} "{pg_channel}"')
+            self._resolve()
+
+    def _execute(self, sql):
+        with self._conn.cursor() as cursor:
+            cursor.execute(sql)
+
+    def _resolve(self):
+        for future in self._waiting:
+            if not future.done():
+                future.set_result(None)
+        self._waiting = []
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+
+class PostgresChannelLayer(BaseChannelLayer):
+    """
+    Channel layer on Postgres LISTEN/NOTIFY, for deployments that already
+    have Postgres and do not want to run Redis for chat.
+
+    Every process keeps its channels' queues and group members in memory
+    and LISTENs on one Postgres channel for itself plus one per group it
+    has members in. group_send delivers to local members directly and
+    NOTIFYs the group's Postgres channel for the other processes; send to
+    another process's channel NOTIFYs that process.
+
+    Postgres is only used from threads: one listener thread
+    (_PostgresListener) and ``send_connections`` sender threads, each with
+    its own connection. A Postgres channel always publishes from the same
+    sender, so messages to one group or channel keep their order.
+
+    NOTIFY payloads are limited to 8000 bytes. Larger messages are written
+    to the channels_layer_payload table (chat.models.ChannelLayerPayload)
+    and the notification carries the row id; rows are deleted after
+    ``payload_ttl`` seconds.
+
+    Like Redis pub/sub (and unlike channels_redis's lists), a notification
+    reaches the processes listening when it is sent; a process whose
+    listener connection is reconnecting misses what is sent meanwhile.
+    The chat consumers recover missed messages with seq sync. LISTEN needs
+    a session, so ``database`` must not go through a transaction pooler.
+    """
+
+    extensions = ["groups", "flush"]
+
+    # NOTIFY's limit is 8000 bytes; keep room for the envelope
+    MAX_NOTIFY_PAYLOAD = 7900
+    # Created by chat migration 0007 (chat.models.ChannelLayerPayload)
+    PAYLOAD_TABLE = "channels_layer_payload"
+
+    def __init__(self, database="default", prefix="chl", payload_ttl=60, reconnect_delay=1,
+                 send_connections=2, listen_timeout=5, **kwargs):
+        super().__init__(**kwargs)
+        self.database = database
+        self.prefix = prefix
+        self.payload_ttl = payload_ttl
+        self.reconnect_delay = reconnect_delay
+        self.listen_timeout = listen_timeout
+        self.client_id = _random_name()
+        self.channels = {}
+        self.groups = {}
+        self._listening = set()
+        self._loop = None
+        self._listener = None
+        self._senders = [
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="channel-layer-send")
+            for _ in range(send_connections)
+        ]
+        self._send_local = threading.local()
+        self._next_payload_cleanup = 0
+
+    # Postgres (worker threads only)
+
+    def _connect(self):
+        import psycopg2
+        from django.core.exceptions import ImproperlyConfigured
+        from django.db import connections
+
+        connection = connections[self.database]
+        if connection.vendor != "postgresql":
+            raise ImproperlyConfigured(f"PostgresChannelLayer needs a Postgres database, '{self.database}' is {connection.vendor}")
+        conn = psycopg2.connect(**connection.get_connection_params())
+        conn.autocommit = True
+        return conn
+
+    def _pg_channel(self, kind, name):
+        # Postgres identifiers are at most 63 characters
+        return f"{self.prefix}_{kind}_{hashlib.sha1(name.encode()).hexdigest()[:32]}"
+
+    def _execute(self, sql, params=()):
+        """Run a statement on this sender thread's own connection."""
+        for attempt in (1, 2):
+            conn = getattr(self._send_local, "conn", None)
+            try:
+                if conn is None or conn.closed:
+                    conn = self._send_local.conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    return cursor.fetchone() if cursor.description else None
+            except Exception:
+                # One retry on a fresh connection (server restart, idle timeout)
+                self._send_local.conn = None
+                if attempt == 2:
+                    raise
+
+    def _close_send_connection(self):
+        conn = getattr(self._send_local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._send_local.conn = None
+
+    def _pack(self, envelope):
+        return base64.b64encode(msgpack.packb(envelope, use_bin_type=True)).decode("ascii")
+
+    def _unpack(self, payload):
+        return msgpack.unpackb(base64.b64decode(payload), raw=False)
+
+    def _store_payload(self, data):
+        now = time.monotonic()
+        if now >= self._next_payload_cleanup:
+            self._next_payload_cleanup = now + self.payload_ttl
+            self._execute(
+                f"DELETE FROM {self.PAYLOAD_TABLE} WHERE created < now() - make_interval(secs => %s)",
+                (self.payload_ttl,),
+            )
+        return self._execute(f"INSERT INTO {self.PAYLOAD_TABLE} (data) VALUES (%s) RETURNING id", (data,))[0]
+
+    def _notify(self, pg_channel, envelope):
+        payload = self._pack(envelope)
+        if len(payload) > self.MAX_NOTIFY_PAYLOAD:
+            payload = f"@{self._store_payload(payload)}"
+        self._execute("SELECT pg_notify(%s, %s)", (pg_channel, payload))
+
+    def _on_notification(self, payload, conn):
+        # Listener thread: decode here and hand only the message to the loop
+        if payload.startswith("@"):
+            with conn.cursor() as cursor:
+                cursor.execute(f"SELECT data FROM {self.PAYLOAD_TABLE} WHERE id = %s", (int(payload[1:]),))
+                row = cursor.fetchone()
+            if row is None:
+                logger.warning(f"[WARNING] Channel layer payload {payload[1:]} expired before delivery")
+                return
+            payload = row[0]
+        envelope = self._unpack(payload)
+        if envelope.get("from") == self.client_id:
+            # Already delivered locally by the sender
+            return
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if envelope.get("group") is not None:
+            loop.call_soon_threadsafe(self._deliver_group, envelope["group"], envelope["message"])
+        else:
+            loop.call_soon_threadsafe(self._deliver_channel, envelope["channel"], envelope["message"])
+
+    # Event loop side
+
+    def _ensure_listener(self):
+        """Deliver to the running loop; start the listener thread once."""
+        self._loop = asyncio.get_running_loop()
+        if self._listener is None:
+            self._listener = _PostgresListener(self._connect, self._on_notification, self.reconnect_delay)
+            self._listener.start()
+            self._listener.submit("LISTEN", self._pg_channel("p", self.client_id))
+
+    async def _listen(self, pg_channel):
+        if pg_channel in self._listening:
+            return
+        self._listening.add(pg_channel)
+        future = asyncio.wrap_future(self._listener.submit("LISTEN", pg_channel))
+        try:
+            await asyncio.wait_for(future, self.listen_timeout)
+        except asyncio.TimeoutError:
+            # Still queued: the listener applies it once Postgres is back
+            logger.warning(f"[WARNING] Channel layer LISTEN not confirmed within {self.listen_timeout}s")
+
+    def _unlisten(self, pg_channel):
+        if pg_channel in self._listening:
+            self._listening.discard(pg_channel)
+            self._listener.submit("UNLISTEN", pg_channel)
+
+    async def _publish(self, pg_channel, envelope):
+        sender = self._senders[zlib.crc32(pg_channel.encode()) % len(self._senders)]
+        await asyncio.get_running_loop().run_in_executor(sender, self._notify, pg_channel, envelope)
+
+    def _is_local(self, channel):
+        return "!" in channel and channel.split("!", 1)[0].endswith(self.client_id)
+
+    def _put(self, channel, message):
+        queue = self.channels.setdefault(channel, asyncio.Queue())
+        if queue.qsize() >= self.get_capacity(channel):
+            raise ChannelFull(channel)
+        queue.put_nowait((time.time() + self.expiry, dict(message)))
+
+    def _deliver_channel(self, channel, message):
+        try:
+            self._put(channel, message)
+        except ChannelFull:
+            logger.warning(f"[WARNING] Channel layer dropped a message for full channel {channel}")
+
+    def _deliver_group(self, group, message):
+        for channel in list(self.groups.get(group, ())):
+            try:
+                self._put(channel, message)
+            except ChannelFull:
+                pass
+
+    def _on_listener_loop(self):
+        loop = self._loop
+        return loop is None or loop.is_closed() or loop is asyncio.get_running_loop()
+
+    # Channel layer API
+
+    async def new_channel(self, prefix="specific."):
+        return f"{prefix}{self.client_id}!{_random_name()}"
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), "message is not a dict"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        assert "__asgi_channel__" not in message
+
+        if self._is_local(channel):
+            if self._on_listener_loop():
+                self._put(channel, message)
+            else:
+                # Local queues belong to the listener's loop; hand sends
+                # from another loop (async_to_sync) over to it
+                self._loop.call_soon_threadsafe(self._deliver_channel, channel, message)
+            return
+        if "!" in channel:
+            # Specific channel of another process
+            process = channel.split("!", 1)[0].rsplit(".", 1)[-1]
+            pg_channel = self._pg_channel("p", process)
+        else:
+            pg_channel = self._pg_channel("c", channel)
+        await self._publish(pg_channel, {"from": self.client_id, "channel": channel, "message": message})
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        self._ensure_listener()
+        if "!" not in channel:
+            # General channel: any process may send to it
+            await self._listen(self._pg_channel("c", channel))
+
+        queue = self.channels.setdefault(channel, asyncio.Queue())
+        try:
+            while True:
+                expires_at, message = await queue.get()
+                if expires_at >= time.time():
+                    return message
+        finally:
+            if queue.empty() and self.channels.get(channel) is queue:
+                del self.channels[channel]
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), "Group name not valid"
+        assert self.valid_channel_name(channel), "Channel name not valid"
+        self._ensure_listener()
+        self.groups.setdefault(group, set()).add(channel)
+        await self._listen(self._pg_channel("g", group))
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), "Invalid group name"
+        assert self.valid_channel_name(channel), "Invalid channel name"
+        members = self.groups.get(group)
+        if members is None:
+            return
+        members.discard(channel)
+        if not members:
+            del self.groups[group]
+            self._unlisten(self._pg_channel("g", group))
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), "Message is not a dict"
+        assert self.valid_group_name(group), "Invalid group name"
+        if self._on_listener_loop():
+            self._deliver_group(group, message)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver_group, group, message)
+        await self._publish(self._pg_channel("g", group), {"from": self.client_id, "group": group, "message": message})
+
+    async def flush(self):
+        self.channels = {}
+        for group in list(self.groups):
+            self._unlisten(self._pg_channel("g", group))
+        self.groups = {}
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            self._listening = set()
+        loop = asyncio.get_running_loop()
+        for sender in self._senders:
+            await loop.run_in_executor(sender, self._close_send_connection)
@@ -0,0 +1,289 @@
+# utils/email_executor.py
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+OVERFLOW_CALLER_RUNS = "caller_runs"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP, OVERFLOW_CALLER_RUNS)
+
+_STOP = object()
+
+
+class EmailQueueStats:
+    """
+    Thread-safe counters for the email worker pool.
+    Latencies are measured from enqueue to completion, in seconds.
+    """
+
+    def __init__(self, executor):
+        self._executor = executor
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.caller_runs = 0
+        self.peak_queue_depth = 0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def record_submit(self):
+        depth = self._executor.queue_depth()
+        with self._lock:
+            self.submitted += 1
+            if depth > self.peak_queue_depth:
+                self.peak_queue_depth = depth
+
+    def record_drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def record_caller_runs(self):
+        with self._lock:
+            self.caller_runs += 1
+
+    def record_done(self, wait, latency, ok):
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.total_wait += wait
+            self.total_latency += latency
+            if latency > self.max_latency:
+                self.max_latency = latency
+
+    def snapshot(self):
+        with self._lock:
+            finished = self.completed + self.failed
+            return {
+                "queue_depth": self._executor.queue_depth(),
+                "peak_queue_depth": self.peak_queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "caller_runs": self.caller_runs,
+                "avg_wait": self.total_wait / finished if finished else 0.0,
+                "avg_latency": self.total_latency / finished if finished else 0.0,
+                "max_latency": self.max_latency,
+            }
+
+
+class EmailExecutor:
+    """
+    Bounded worker pool for outbound email.
+
+    A fixed number of worker threads pull jobs from a bounded queue, so a
+    burst of signups or contact-form posts can never create more than
+    ``max_workers`` concurrent Brevo calls per process. When the queue is
+    full the ``overflow`` policy decides what happens to the new job:
+
+        block        wait up to ``block_timeout`` seconds for a free slot, then drop
+        drop         drop the job immediately
+        caller_runs  run the job synchronously in the calling thread
+    """
+
+    def __init__(self, max_workers=4, max_queue_size=500, overflow=OVERFLOW_BLOCK,
+                 block_timeout=2.0, name="email-worker"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown email queue overflow policy: {overflow!r}")
+
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue_size = max(1, int(max_queue_size))
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._workers = []
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self.stats = EmailQueueStats(self)
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queue ``fn(*args, **kwargs)`` for a worker thread.
+
+        Returns a ``concurrent.futures.Future`` for the job, or None if the
+        job was dropped because the queue was full or the pool is shut down.
+        """
+        if self._shutdown:
+            logger.warning("[WARNING] Email executor is shut down, dropping job")
+            self.stats.record_drop()
+            return None
+
+        self._start_workers()
+
+        future = Future()
+        job = (future, fn, args, kwargs, time.monotonic())
+
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                self._queue.put(job, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(job)
+        except queue.Full:
+            if self.overflow == OVERFLOW_CALLER_RUNS:
+                self.stats.record_caller_runs()
+                self._run(job)
+                return future
+
+            self.stats.record_drop()
+            logger.error(
+                f"[ERROR] Email queue full ({self.max_queue_size} pending), dropping job"
+            )
+            return None
+
+        self.stats.record_submit()
+        return future
+
+    def shutdown(self, drain=True, timeout=None):
+        """
+        Stop the worker threads.
+
+        With ``drain=True`` the jobs already queued are sent first; otherwise
+        they are discarded. Waits at most ``timeout`` seconds in total.
+        """
+        with self._lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            workers = list(self._workers)
+
+        if not drain:
+            discarded = 0
+            while True:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                job[0].cancel()
+                discarded += 1
+            if discarded:
+                logger.warning(f"[WARNING] Discarded {discarded} queued emails on shutdown")
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for _ in workers:
+            try:
+                self._queue.put(_STOP, timeout=self._remaining(deadline))
+            except queue.Full:
+                break
+
+        for worker in workers:
+            worker.join(self._remaining(deadline))
+
+        pending = self.queue_depth()
+        if pending:
+            logger.error(f"[ERROR] Email executor shut down with {pending} emails still queued")
+        else:
+            logger.info("Email executor drained and shut down")
+
+    @staticmethod
+    def _remaining(deadline):
+        if deadline is None:
+            return None
+        return max(0.0, deadline - time.monotonic())
+
+    def _start_workers(self):
+        if len(self._workers) >= self.max_workers:
+            return
+        with self._lock:
+            while len(self._workers) < self.max_workers:
+                worker = threading.Thread(
+                    target=self._worker,
+                    name=f"{self.name}-{len(self._workers)}",
+                    daemon=True,
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            self._run(job)
+
+    def _run(self, job):
+        future, fn, args, kwargs, enqueued_at = job
+        if not future.set_running_or_notify_cancel():
+            return
+
+        started_at = time.monotonic()
+        ok = True
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            ok = False
+            logger.error(f"[ERROR] Exception in email worker: {str(e)}")
+            future.set_exception(e)
+        finally:
+            finished_at = time.monotonic()
+            self.stats.record_done(started_at - enqueued_at, finished_at - enqueued_at, ok)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_email_executor():
+    """
+    Return the process-wide email executor, creating it on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = EmailExecutor(
+                    max_workers=getattr(settings, "EMAIL_WORKER_THREADS", 4),
+                    max_queue_size=getattr(settings, "EMAIL_QUEUE_MAXSIZE", 500),
+                    overflow=getattr(settings, "EMAIL_QUEUE_OVERFLOW", OVERFLOW_BLOCK),
+                    block_timeout=getattr(settings, "EMAIL_QUEUE_BLOCK_TIMEOUT", 2.0),
+                )
+    return _executor
+
+
+def shutdown_email_executor(drain=True, timeout=None):
+    """
+    Drain-on-shutdown hook. Registered with atexit so a recycled gunicorn
+    worker finishes its queued sends before the process exits.
+    """
+    executor = _executor
+    if executor is None:
+        return
+    if timeout is None:
+        timeout = getattr(settings, "EMAIL_SHUTDOWN_TIMEOUT", 10.0)
+    executor.shutdown(drain=drain, timeout=timeout)
+
+
+def email_queue_stats():
+    executor = _executor
+    return executor.stats.snapshot() if executor is not None else {}
+
+
+def _reset_after_fork():
+    # Worker threads are not inherited by a forked child (gunicorn --preload),
+    # so the child must build its own pool.
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+atexit.register(shutdown_email_executor)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
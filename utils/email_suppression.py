@@ -0,0 +1,156 @@
+# utils/email_suppression.py
+import logging
+import threading
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+from utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Brevo webhook events that put an address on the suppression list
+SUPPRESSING_EVENTS = {
+    "hard_bounce": "hard_bounce",
+    "invalid_email": "invalid_email",
+    "blocked": "blocked",
+    "spam": "spam",
+    "complaint": "spam",
+    "unsubscribed": "unsubscribed",
+}
+
+# Reasons that only stop marketing mail: someone who unsubscribed from
+# announcements still gets password resets and payment receipts
+MARKETING_ONLY_REASONS = {"unsubscribed"}
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+class SuppressionList:
+    """
+    Read side of the EmailSuppression table. Lookups go through a per-process
+    TTL cache of each address's reason (misses cached as None), so a send
+    costs at most one indexed
+    query for addresses not seen in the last EMAIL_SUPPRESSION_CACHE_TTL
+    seconds. A webhook served by another worker reaches this process once
+    the cached entry expires.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(
+            maxsize=getattr(settings, 'EMAIL_SUPPRESSION_CACHE_SIZE', 10000),
+            ttl=getattr(settings, 'EMAIL_SUPPRESSION_CACHE_TTL', 300),
+        )
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, recipient_list, marketing=False):
+        """
+        Split recipients into (deliverable, suppressed) lists. Unsubscribed
+        addresses are only suppressed for marketing mail.
+        """
+        try:
+            reasons = self._lookup([normalize_email(email) for email in recipient_list])
+        except Exception as e:
+            logger.error(f"[ERROR] Suppression list unavailable, sending anyway: {str(e)}")
+            return list(recipient_list), []
+
+        deliverable, suppressed = [], []
+        for email in recipient_list:
+            reason = reasons[normalize_email(email)]
+            if reason and (marketing or reason not in MARKETING_ONLY_REASONS):
+                suppressed.append(email)
+            else:
+                deliverable.append(email)
+
+        if suppressed:
+            with self._lock:
+                self.suppressed += len(suppressed)
+        return deliverable, suppressed
+
+    def _lookup(self, emails):
+        reasons, missing = self._cache.get_many(emails)
+        if missing:
+            from mailer.models import EmailSuppression
+
+            found = dict(EmailSuppression.objects.filter(email__in=missing).values_list('email', 'reason'))
+            for email in missing:
+                reasons[email] = found.get(email)
+                self._cache.set(email, reasons[email])
+        return reasons
+
+    def mark(self, reasons):
+        """
+        Update the local cache after a webhook or admin change:
+        {email: reason, or None once the address is no longer suppressed}.
+        """
+        for email, reason in reasons.items():
+            self._cache.set(normalize_email(email), reason)
+
+    def stats(self):
+        with self._lock:
+            suppressed = self.suppressed
+        return {
+            "suppressed": suppressed,
+            "cache_size": len(self._cache),
+            "cache_hits": self._cache.hits,
+            "cache_misses": self._cache.misses,
+        }
+
+
+suppression_list = SuppressionList()
+
+
+def record_brevo_events(events):
+    """
+    Store Brevo webhook events. Bounce, block, invalid address, spam
+    complaint and unsubscribe events are upserted into EmailSuppression
+    (unsubscribes only hold back marketing mail);
+    other events (delivered, opened, soft_bounce, ...) are ignored.
+    Returns the number of suppressed addresses written.
+    """
+    from mailer.models import EmailSuppression
+
+    rows = {}
+    for event in events:
+        reason = SUPPRESSING_EVENTS.get(event.get("event"))
+        email = event.get("email")
+        if not reason or not email:
+            continue
+        email = normalize_email(email)
+        rows[email] = EmailSuppression(
+            email=email,
+            reason=reason,
+            detail=event.get("reason") or "",
+            message_id=event.get("message-id") or "",
+            event_at=_event_time(event),
+        )
+
+    if not rows:
+        return 0
+
+    # One upsert for the whole webhook batch
+    EmailSuppression.objects.bulk_create(
+        rows.values(),
+        update_conflicts=True,
+        unique_fields=['email'],
+        update_fields=['reason', 'detail', 'message_id', 'event_at', 'updated_at'],
+    )
+    suppression_list.mark({email: row.reason for email, row in rows.items()})
+    logger.info(f"Suppressed {len(rows)} addresses from Brevo webhook events")
+    return len(rows)
+
+
+def _event_time(event):
+    # Brevo sends a unix timestamp in ts_event (and ts for older webhooks)
+    ts = event.get("ts_event") or event.get("ts")
+    try:
+        return datetime.fromtimestamp(int(ts), tz=timezone.utc) if ts else None
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def email_suppression_stats():
+    return suppression_list.stats()
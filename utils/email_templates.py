@@ -0,0 +1,170 @@
+# utils/email_templates.py
+import logging
+import re
+from html import escape
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+LAYOUT_DIR = Path(__file__).resolve().parent / "email_layouts"
+
+# {{ name }} inserts an HTML-escaped value, {{#name}}...{{/name}} renders the
+# block only when the value is truthy (once per item, with the item's keys
+# added to the context, when the value is a list), {{> partial }} includes
+# another file from the layout directory at compile time.
+_TAG_RE = re.compile(r"\{\{\s*([#/])?\s*([\w.]+)\s*\}\}")
+_INCLUDE_RE = re.compile(r"\{\{\s*>\s*([\w.-]+)\s*\}\}")
+_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.S)
+_STYLE_RE = re.compile(r"(<style[^>]*>)(.*?)(</style>)", re.S | re.I)
+_CSS_SPACE_RE = re.compile(r"\s*([{};:,>])\s*")
+_SPACE_RE = re.compile(r"\s+")
+
+
+class TemplateSyntaxError(ValueError):
+    pass
+
+
+def minify_html(source):
+    """
+    Strip comments and collapse whitespace. Runs of whitespace become a
+    single space (so inline elements keep their spacing) and CSS inside
+    <style> blocks is packed.
+    """
+    source = _COMMENT_RE.sub("", source)
+
+    def _pack_css(match):
+        css = _SPACE_RE.sub(" ", match.group(2))
+        css = _CSS_SPACE_RE.sub(r"\1", css).replace(";}", "}")
+        return f"{match.group(1)}{css.strip()}{match.group(3)}"
+
+    source = _STYLE_RE.sub(_pack_css, source)
+    return _SPACE_RE.sub(" ", source).strip()
+
+
+class EmailTemplate:
+    """
+    A layout compiled once into literal chunks and field slots.
+    Rendering only escapes and joins the per-recipient values.
+    """
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        self._compiled = self._flatten(self._compile(source))
+
+    def _compile(self, source):
+        # Nodes are literal strings, ("field", name) slots and
+        # ("section", name, children) blocks
+        root = []
+        stack = [(None, root)]
+        position = 0
+
+        for match in _TAG_RE.finditer(source):
+            if match.start() > position:
+                stack[-1][1].append(source[position:match.start()])
+            position = match.end()
+
+            kind, name = match.groups()
+            if kind == "#":
+                children = []
+                stack[-1][1].append(("section", name, children))
+                stack.append((name, children))
+            elif kind == "/":
+                if stack[-1][0] != name:
+                    raise TemplateSyntaxError(f"{self.name}: unexpected closing tag for '{name}'")
+                stack.pop()
+            else:
+                stack[-1][1].append(("field", name))
+
+        if len(stack) > 1:
+            raise TemplateSyntaxError(f"{self.name}: section '{stack[-1][0]}' is never closed")
+        if position < len(source):
+            root.append(source[position:])
+        return root
+
+    def _flatten(self, nodes):
+        # Pre-build the output as a list of literal chunks with empty slots
+        # for the fields and sections; rendering copies the list, fills the
+        # slots and joins it.
+        parts = []
+        slots = []
+        for node in nodes:
+            if node.__class__ is str:
+                parts.append(node)
+            else:
+                section = self._flatten(node[2]) if node[0] == "section" else None
+                slots.append((len(parts), node[1], section))
+                parts.append("")
+        return parts, slots
+
+    def render(self, **context):
+        return self._render(self._compiled, context)
+
+    def _render(self, compiled, context):
+        parts, slots = compiled
+        parts = parts.copy()
+        for index, name, section in slots:
+            value = context.get(name)
+            if section is not None:
+                if value.__class__ in (list, tuple):
+                    parts[index] = "".join(self._render(section, {**context, **item}) for item in value)
+                elif value:
+                    parts[index] = self._render(section, context)
+            elif value is not None:
+                parts[index] = escape(str(value))
+        return "".join(parts)
+
+
+class EmailTemplateRegistry:
+    """
+    Loads every layout in a directory, resolves includes, minifies and
+    compiles it once. Files starting with "_" are partials: they can be
+    included but are not registered as templates themselves.
+    """
+
+    def __init__(self, directory=LAYOUT_DIR):
+        self.directory = Path(directory)
+        self._templates = {}
+        self._load()
+
+    def _load(self):
+        partials = {
+            path.name: path.read_text(encoding="utf-8")
+            for path in self.directory.iterdir()
+            if path.name.startswith("_")
+        }
+
+        def _include(match):
+            try:
+                return partials[match.group(1)]
+            except KeyError:
+                raise TemplateSyntaxError(f"Unknown email partial '{match.group(1)}'")
+
+        for path in sorted(self.directory.glob("*.html")):
+            if path.name.startswith("_"):
+                continue
+            source = _INCLUDE_RE.sub(_include, path.read_text(encoding="utf-8"))
+            self.register(path.stem, source)
+
+        logger.info(f"Compiled {len(self._templates)} email templates")
+
+    def register(self, name, source):
+        self._templates[name] = EmailTemplate(name, minify_html(source))
+
+    def get(self, name):
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise KeyError(f"Unknown email template '{name}'") from None
+
+    def render(self, template_name, /, **context):
+        return self.get(template_name).render(**context)
+
+
+# Compiled once at process start
+email_templates = EmailTemplateRegistry()
+
+
+def render_email(template_name, /, **context):
+    """Render a registered email layout; every value is HTML-escaped."""
+    return email_templates.render(template_name, **context)
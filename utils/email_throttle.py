@@ -0,0 +1,181 @@
+# utils/email_throttle.py
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+# Outcomes of EmailThrottle.admit()
+ALLOWED = "allowed"
+COOLDOWN = "cooldown"
+COLLAPSED = "collapsed"
+RATE_LIMITED = "rate_limited"
+
+
+def _digest(*parts):
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:32]
+
+
+class EmailThrottleStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {ALLOWED: 0, COOLDOWN: 0, COLLAPSED: 0, RATE_LIMITED: 0}
+
+    def record(self, outcome):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class EmailThrottle:
+    """
+    Admission control in front of the email worker pool. All state lives in
+    the Django cache (Redis in production), so the limits hold across
+    gunicorn workers and daphne processes:
+
+        cooldown   a template (e.g. "password_reset") goes to one address at
+                   most once per EMAIL_THROTTLE_COOLDOWNS[template] seconds
+        collapse   an identical message that is still queued or sending is
+                   not queued again
+        rate       at most EMAIL_GLOBAL_RATE_LIMIT sends in any
+                   EMAIL_GLOBAL_RATE_WINDOW seconds (sliding window: the
+                   previous window's count is weighted by how much of it
+                   still overlaps, so a burst cannot straddle a boundary)
+
+    Every check is a single cache.add/incr, so concurrent requests cannot
+    both pass. If the cache is down the throttle fails open. Rate-limited
+    mail is deferred by the caller (see retry_after()), not dropped.
+    """
+
+    key_prefix = "email-throttle"
+
+    def __init__(self, cache_alias=None):
+        self.cache_alias = cache_alias or getattr(settings, 'EMAIL_THROTTLE_CACHE', 'default')
+        self.stats = EmailThrottleStats()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def admit(self, subject, message, recipient_list, html_message=None, from_email=None, template=None):
+        """
+        Decide whether an email may be queued.
+
+        Returns (outcome, recipients, release). ``recipients`` are the
+        addresses that are not in their cooldown window; ``release`` must be
+        called once the send has finished so identical messages can be
+        sent again.
+        """
+        try:
+            outcome, recipients, release = self._admit(
+                subject, message, recipient_list, html_message, from_email, template
+            )
+        except Exception as e:
+            logger.error(f"[ERROR] Email throttle unavailable, sending unthrottled: {str(e)}")
+            outcome, recipients, release = ALLOWED, list(recipient_list), _noop
+
+        self.stats.record(outcome)
+        return outcome, recipients, release
+
+    def _admit(self, subject, message, recipient_list, html_message, from_email, template):
+        cache = self.cache
+        recipients = list(recipient_list)
+
+        # Collapse identical pending messages
+        pending_key = f"{self.key_prefix}:pending:{_digest(subject, message, html_message, from_email, *sorted(recipients))}"
+        if not cache.add(pending_key, 1, getattr(settings, 'EMAIL_DEDUPE_TTL', 300)):
+            return COLLAPSED, [], _noop
+
+        taken = [pending_key]
+
+        def release():
+            cache.delete_many(taken)
+
+        # Per-recipient, per-template cooldown
+        cooldown = getattr(settings, 'EMAIL_THROTTLE_COOLDOWNS', {}).get(template) if template else None
+        if cooldown:
+            allowed = []
+            for email in recipients:
+                key = f"{self.key_prefix}:cooldown:{template}:{_digest(email.strip().lower())}"
+                if cache.add(key, 1, cooldown):
+                    allowed.append(email)
+                    taken.append(key)
+            if not allowed:
+                release()
+                return COOLDOWN, [], _noop
+            recipients = allowed
+
+        # Global rate shared by every worker
+        limit = getattr(settings, 'EMAIL_GLOBAL_RATE_LIMIT', 0)
+        if limit:
+            window = getattr(settings, 'EMAIL_GLOBAL_RATE_WINDOW', 60)
+            current_key, previous_key, elapsed = self._windows(window)
+            cache.add(current_key, 0, window * 2)
+            current = cache.incr(current_key)
+            previous = cache.get(previous_key, 0)
+            if previous * (1 - elapsed) + current > limit:
+                # Give the slot back, and the cooldown slots so the send can
+                # be retried later
+                cache.decr(current_key)
+                release()
+                return RATE_LIMITED, [], _noop
+
+        # Only the pending marker is released when the send completes
+        del taken[1:]
+        return ALLOWED, recipients, release
+
+
+    def _windows(self, window):
+        """Keys of the current and previous window, and the share of the current window elapsed."""
+        position = time.time() / window
+        index = int(position)
+        return (
+            f"{self.key_prefix}:window:{index}",
+            f"{self.key_prefix}:window:{index - 1}",
+            position - index,
+        )
+
+    def retry_after(self):
+        """Seconds until the global rate may admit another send (estimate)."""
+        limit = getattr(settings, 'EMAIL_GLOBAL_RATE_LIMIT', 0)
+        window = getattr(settings, 'EMAIL_GLOBAL_RATE_WINDOW', 60)
+        if not limit:
+            return 0
+        try:
+            current_key, previous_key, elapsed = self._windows(window)
+            current = self.cache.get(current_key, 0)
+            previous = self.cache.get(previous_key, 0)
+        except Exception:
+            return window / limit
+        if current >= limit:
+            # Full by itself: wait into the next window, until this one's
+            # weight leaves room
+            return (1 - elapsed + max(0.0, 1 - (limit - 1) / current)) * window
+        if previous:
+            # The previous window's weight must drop below the room left
+            needed = 1 - (limit - current - 1) / previous
+            if needed > elapsed:
+                return (needed - elapsed) * window
+        return window / limit
+
+
+def _noop():
+    pass
+
+
+_throttle = EmailThrottle()
+
+
+def get_email_throttle():
+    return _throttle
+
+
+def email_throttle_stats():
+    return _throttle.stats.snapshot()
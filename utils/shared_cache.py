@@ -0,0 +1,13 @@
+# utils/shared_cache.py
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def cache_is_shared(alias='default'):
+    """
+    Whether every worker process sees the same entries in this cache. The
+    LocMemCache used without REDIS_URL is per process: an entry written
+    or deleted by one worker is invisible to the others.
+    """
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
@@ -17,6 +17,7 @@ from .serializers import (
 
 # Import Brevo API email sender
 from utils.brevo_email import send_email_async_api
+from utils.email_templates import render_email
 
 logger = logging.getLogger(__name__)
 
@@ -62,60 +63,14 @@ class WebsiteRequestCreateView(generics.CreateAPIView):
             f'The FrameStack Team'
         )
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px 10px 0 0; text-align: center; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 10px 10px; }}
-                .details {{ background: white; padding: 20px; border-radius: 5px; margin: 20px 0; }}
-                .detail-row {{ display: flex; justify-content: space-between; padding: 10px 0; border-bottom: 1px solid #eee; }}
-                .button {{ display: inline-block; padding: 12px 30px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; margin-top: 20px; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>✅ Website Request Created</h1>
-                </div>
-                <div class="content">
-                    <h2>Hello {user.name}!</h2>
-                    <p>Your website request has been created successfully and our team will start processing it soon.</p>
-                    
-                    <div class="details">
-                        <h3>Request Details:</h3>
-                        <div class="detail-row">
-                            <span><strong>Request ID:</strong></span>
-                            <span>{request_obj.id}</span>
-                        </div>
-                        <div class="detail-row">
-                            <span><strong>Website Name:</strong></span>
-                            <span>{request_obj.website_name}</span>
-                        </div>
-                    
-                        <div class="detail-row">
-                            <span><strong>Status:</strong></span>
-                            <span style="color: #28a745;">{request_obj.status}</span>
-                        </div>
-                    </div>
-                    
-                    <center>
-                        <a href="{settings.FRONTEND_URL}/dashboard" class="button">View in Dashboard</a>
-                    </center>
-                    
-                    <p style="margin-top: 30px;">We'll notify you once there's an update on your request.</p>
-                </div>
-                <div class="footer">
-                    <p>© 2024 FrameStack. All rights reserved.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        html_message = render_email(
+            'website_request_created',
+            name=user.name,
+            request_id=request_obj.id,
+            website_name=request_obj.website_name,
+            status=request_obj.status,
+            frontend_url=settings.FRONTEND_URL,
+        )
         
         # Send email asynchronously using Brevo API
         send_email_async(subject, message, [user.email], html_message)
@@ -214,44 +169,14 @@ class WebsiteRequestUserUpdateView(generics.UpdateAPIView):
                 f'The FrameStack Team'
             )
             
-            html_message = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                    .success {{ background: #d4edda; border: 1px solid #28a745; padding: 20px; border-radius: 5px; text-align: center; }}
-                    .details {{ background: #f8f9fa; padding: 20px; border-radius: 5px; margin: 20px 0; }}
-                    .button {{ display: inline-block; padding: 10px 20px; background-color: #28a745; color: white; text-decoration: none; border-radius: 5px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="success">
-                        <h2>✅ Request Updated Successfully</h2>
-                    </div>
-                    
-                    <p>Hello {request.user.name},</p>
-                    <p>Your website request has been updated successfully.</p>
-                    
-                    <div class="details">
-                        <h3>Updated Information:</h3>
-                        <p><strong>Request ID:</strong> {instance.id}</p>
-                        <p><strong>Website Name:</strong> {instance.website_name}</p>
-                    
-                        <p><strong>Status:</strong> {instance.status}</p>
-                    </div>
-                    
-                    <center>
-                        <a href="{settings.FRONTEND_URL}/requests/{instance.id}" class="button">View Request</a>
-                    </center>
-                    
-                    <p style="margin-top: 30px;">Thank you for using FrameStack!</p>
-                </div>
-            </body>
-            </html>
-            """
+            html_message = render_email(
+                'website_request_updated',
+                name=request.user.name,
+                request_id=instance.id,
+                website_name=instance.website_name,
+                status=instance.status,
+                frontend_url=settings.FRONTEND_URL,
+            )
 
             send_email_async(subject, message, [request.user.email], html_message)
             
@@ -327,89 +252,18 @@ class AdminWebsiteRequestUpdateView(generics.UpdateAPIView):
                 )
                 
                 # HTML version with better styling
-                html_message = f"""
-                <!DOCTYPE html>
-                <html>
-                <head>
-                    <style>
-                        body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                        .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                        .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; border-radius: 10px; text-align: center; }}
-                        .status-badge {{ display: inline-block; padding: 8px 16px; border-radius: 20px; font-weight: bold; margin: 10px 0; }}
-                        .status-completed {{ background: #28a745; color: white; }}
-                        .status-processing {{ background: #ffc107; color: #333; }}
-                        .status-cancelled {{ background: #dc3545; color: white; }}
-                        .status-on_hold {{ background: #6c757d; color: white; }}
-                        .content {{ background: #f9f9f9; padding: 30px; border-radius: 10px; margin-top: 20px; }}
-                        .details {{ background: white; padding: 20px; border-radius: 5px; margin: 20px 0; }}
-                        .detail-row {{ padding: 10px 0; border-bottom: 1px solid #eee; }}
-                        .button {{ display: inline-block; padding: 12px 30px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; margin: 20px 0; }}
-                        .url-box {{ background: #e8f4f8; padding: 15px; border-radius: 5px; margin: 10px 0; word-break: break-all; }}
-                    </style>
-                </head>
-                <body>
-                    <div class="container">
-                        <div class="header">
-                            <h1>Website Request Update</h1>
-                            <div class="status-badge status-{updated_instance.status}">
-                                {updated_instance.status.upper()}
-                            </div>
-                        </div>
-                        
-                        <div class="content">
-                            <h2>Hello {instance.user.name}!</h2>
-                            <p>{status_message}</p>
-                            
-                            <div class="details">
-                                <h3>Request Details:</h3>
-                                <div class="detail-row">
-                                    <strong>Request ID:</strong> {instance.id}
-                                </div>
-                                <div class="detail-row">
-                                    <strong>Website Name:</strong> {instance.website_name}
-                                </div>
-                           
-                                <div class="detail-row">
-                                    <strong>Status:</strong> <span style="color: #667eea;">{updated_instance.status}</span>
-                                </div>
-                """
-                
-                # Add URLs if available
-                if updated_instance.sample_url:
-                    html_message += f"""
-                                <div class="detail-row">
-                                    <strong>Sample URL:</strong>
-                                    <div class="url-box">
-                                        <a href="{updated_instance.sample_url}" style="color: #667eea;">{updated_instance.sample_url}</a>
-                                    </div>
-                                </div>
-                    """
-                
-                if updated_instance.original_url:
-                    html_message += f"""
-                                <div class="detail-row">
-                                    <strong>Original URL:</strong>
-                                    <div class="url-box">
-                                        <a href="{updated_instance.original_url}" style="color: #667eea;">{updated_instance.original_url}</a>
-                                    </div>
-                                </div>
-                    """
-                
-                html_message += f"""
-                            </div>
-                            
-                            <center>
-                                <a href="{settings.FRONTEND_URL}/requests/{instance.id}" class="button">View Full Details</a>
-                            </center>
-                            
-                            <p style="margin-top: 30px; color: #666;">
-                                If you have any questions, please don't hesitate to contact our support team.
-                            </p>
-                        </div>
-                    </div>
-                </body>
-                </html>
-                """
+                html_message = render_email(
+                    'website_request_status',
+                    name=instance.user.name,
+                    request_id=instance.id,
+                    website_name=instance.website_name,
+                    status=updated_instance.status,
+                    status_label=updated_instance.status.upper(),
+                    status_message=status_message,
+                    sample_url=updated_instance.sample_url,
+                    original_url=updated_instance.original_url,
+                    frontend_url=settings.FRONTEND_URL,
+                )
                 
                 # Send notification email via Brevo API
                 send_email_async(subject, message, [instance.user.email], html_message)
@@ -454,31 +308,11 @@ class WebsiteRequestDeleteView(generics.DestroyAPIView):
             f'The FrameStack Team'
         )
         
-        html_message = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Arial', sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .alert {{ background: #f8d7da; border: 1px solid #f5c6cb; padding: 20px; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="alert">
-                    <h2>Website Request Deleted</h2>
-                </div>
-                
-                <p>Hello {user_name},</p>
-                <p>Your website request (ID: {request_id}) has been deleted by an administrator.</p>
-                <p>If you believe this was done in error, please contact our support team immediately.</p>
-                
-                <p>Best regards,<br>The FrameStack Team</p>
-            </div>
-        </body>
-        </html>
-        """
+        html_message = render_email(
+            'website_request_deleted',
+            name=user_name,
+            request_id=request_id,
+        )
         
         send_email_async(subject, message, [user_email], html_message)
         